@@ -22,6 +22,9 @@ LOGS_DIR = Path(__file__).parent.parent / "logs"
 # Cooldown for error alerts (seconds)
 ERROR_ALERT_COOLDOWN = 180
 
+# References to in-flight alert tasks (the event loop keeps only weak ones)
+_alert_tasks: set[asyncio.Task] = set()
+
 
 def _iter_log_files() -> Iterable[Path]:
     """
@@ -117,9 +120,15 @@ class AdminErrorAlertHandler(logging.Handler):
         if record.pathname:
             message += f"<b>File:</b> {record.pathname}:{record.lineno}"
 
+        # The alert is sent in the background so the code that logged the error
+        # never waits for Telegram
         try:
             loop = asyncio.get_running_loop()
-            loop.create_task(send_admin_notification_with_log(self.bot, message))
+            task = loop.create_task(
+                send_admin_notification_with_log(self.bot, message)
+            )
+            _alert_tasks.add(task)
+            task.add_done_callback(_alert_tasks.discard)
         except RuntimeError:
             logger.warning("Event loop not running, admin alert skipped")
         except Exception as exc:
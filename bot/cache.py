@@ -0,0 +1,136 @@
+"""
+Модуль для кэширования данных в памяти процесса.
+
+Содержит:
+- TTLCache - простой кэш с временем жизни записей и ограничением размера
+- InflightRequests - объединение одновременных одинаковых запросов в один
+- user_cache - кэш расшифрованных данных пользователей (для get_user)
+- market_cache, orderbook_cache - кэш публичных данных рынков и стаканов
+- balance_cache - кэш балансов пользователей (все токены аккаунта)
+
+Бот работает в одном процессе, поэтому внешний кэш (Redis) не нужен:
+данные пользователей (включая расшифрованные ключи) не покидают процесс.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Время жизни записи о пользователе в кэше (секунды)
+USER_CACHE_TTL = 300
+
+# Время жизни метаданных рынка в кэше (секунды)
+MARKET_CACHE_TTL = 60
+
+# Время жизни стакана в кэше (секунды) - стакан быстро устаревает
+ORDERBOOK_CACHE_TTL = 5
+
+# Время жизни баланса в кэше (секунды) - только для повторных проверок подряд,
+# после размещения/отмены ордеров запись сбрасывается явно
+BALANCE_CACHE_TTL = 2
+
+
+class TTLCache:
+    """
+    Кэш ключ-значение с временем жизни записей.
+
+    Записи хранятся в порядке последнего обращения; при превышении maxsize
+    удаляется самая давно использованная запись. Время отсчитывается
+    по time.monotonic(), поэтому кэш не зависит от перевода системных часов.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        """
+        Args:
+            ttl: Время жизни записи по умолчанию (секунды)
+            maxsize: Максимальное количество записей
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Возвращает значение по ключу или default, если записи нет или она устарела."""
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Сохраняет значение по ключу (ttl по умолчанию берется из конструктора)."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Удаляет запись по ключу (если она есть)."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class InflightRequests:
+    """
+    Объединяет одновременные запросы с одинаковым ключом (singleflight).
+
+    Первый вызов запускает запрос, остальные вызовы с тем же ключом ждут
+    его результат, пока он выполняется. Результат не кэшируется: после
+    завершения запроса следующий вызов выполнит новый запрос.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Выполняет factory() или присоединяется к уже выполняющемуся запросу.
+
+        Args:
+            key: Ключ запроса
+            factory: Функция, возвращающая корутину запроса
+
+        Returns:
+            Результат запроса (исключения пробрасываются всем ожидающим)
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # shield: отмена одного из ожидающих не отменяет общий запрос
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+# Кэш пользователей: telegram_id -> dict с расшифрованными данными
+user_cache = TTLCache(ttl=USER_CACHE_TTL)
+
+# Кэш рынков: (market_id, is_categorical) -> объект рынка из SDK
+market_cache = TTLCache(ttl=MARKET_CACHE_TTL, maxsize=256)
+
+# Кэш стаканов: token_id -> объект стакана из SDK
+orderbook_cache = TTLCache(ttl=ORDERBOOK_CACHE_TTL, maxsize=512)
+
+# Кэш балансов: api_key пользователя -> {адрес токена: доступный баланс}
+balance_cache = TTLCache(ttl=BALANCE_CACHE_TTL)
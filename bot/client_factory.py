@@ -5,6 +5,7 @@
 import base64
 import logging
 import os
+from functools import lru_cache
 from typing import Optional
 
 from config import settings
@@ -16,23 +17,16 @@ from opinion_clob_sdk import Client
 logger = logging.getLogger(__name__)
 
 
-def parse_proxy_config() -> Optional[dict]:
+@lru_cache(maxsize=32)
+def _parse_proxy_string(
+    proxy_str: str,
+) -> Optional[tuple[str, tuple[tuple[str, str], ...]]]:
     """
-    Парсит строку прокси формата host:port:username:password и возвращает конфигурацию прокси.
-
-    Формат прокси: host:port:username:password
-    Пример: 91.216.186.156:8000:Ym81H9:ysZcvQ
+    Парсит строку прокси host:port:username:password (результат кэшируется).
 
     Returns:
-        Словарь с ключами:
-        - proxy_url: URL прокси без аутентификации (http://host:port)
-        - proxy_headers: Заголовки для аутентификации прокси
+        Неизменяемый кортеж (proxy_url, пары заголовков) или None при ошибке
     """
-    proxy_str = settings.proxy or os.getenv("PROXY")
-
-    if not proxy_str:
-        return None
-
     try:
         parts = proxy_str.split(":")
         if len(parts) != 4:
@@ -49,14 +43,42 @@ def parse_proxy_config() -> Optional[dict]:
         # Формируем заголовки для базовой аутентификации
         credentials = f"{username}:{password}"
         encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        proxy_headers = {"Proxy-Authorization": f"Basic {encoded_credentials}"}
+        proxy_headers = (("Proxy-Authorization", f"Basic {encoded_credentials}"),)
 
-        return {"proxy_url": proxy_url, "proxy_headers": proxy_headers}
+        return proxy_url, proxy_headers
     except Exception as e:
         logger.error(f"Ошибка при парсинге прокси: {e}")
         return None
 
 
+def parse_proxy_config() -> Optional[dict]:
+    """
+    Парсит строку прокси формата host:port:username:password и возвращает конфигурацию прокси.
+
+    Формат прокси: host:port:username:password
+    Пример: 91.216.186.156:8000:Ym81H9:ysZcvQ
+
+    Разбор строки и base64-кодирование выполняются один раз для каждой строки
+    прокси; при повторных вызовах из кэша собираются новые словари.
+
+    Returns:
+        Словарь с ключами:
+        - proxy_url: URL прокси без аутентификации (http://host:port)
+        - proxy_headers: Заголовки для аутентификации прокси
+    """
+    proxy_str = settings.proxy or os.getenv("PROXY")
+
+    if not proxy_str:
+        return None
+
+    parsed = _parse_proxy_string(proxy_str)
+    if parsed is None:
+        return None
+
+    proxy_url, proxy_headers = parsed
+    return {"proxy_url": proxy_url, "proxy_headers": dict(proxy_headers)}
+
+
 def get_proxy_url() -> Optional[str]:
     """
     Парсит строку прокси и возвращает полный URL с аутентификацией.
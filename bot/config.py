@@ -19,6 +19,11 @@ class Settings(BaseSettings):
     # Формат: host:port:username:password (например: 91.216.186.156:8000:Ym81H9:ysZcvQ)
     proxy: Optional[str] = None
 
+    # Redis для хранения FSM состояний (опционально)
+    # Формат: redis://host:port/db (например: redis://redis:6379/0)
+    # Если не указан, состояния хранятся в памяти процесса
+    redis_url: Optional[str] = None
+
     # Опциональные параметры для Opinion SDK
     conditional_token_addr: str = "0xAD1a38cEc043e70E83a3eC30443dB285ED10D774"
     multisend_addr: str = "0x998739BFdAAdde7C933B942a68053933098f9EDa"
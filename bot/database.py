@@ -8,6 +8,7 @@
 - Экспорта данных
 """
 
+import asyncio
 import csv
 import io
 import logging
@@ -17,6 +18,7 @@ from typing import Optional
 
 import aiosqlite
 from aes import decrypt, encrypt
+from cache import user_cache
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -24,6 +26,77 @@ logger = logging.getLogger(__name__)
 # Путь к базе данных SQLite (в той же папке, что и скрипт)
 DB_PATH = Path(__file__).parent / "users.db"
 
+# ============================================================================
+# SQL-запросы горячего пути
+# ============================================================================
+# Тексты запросов вынесены в константы, чтобы не дублировать SQL между функциями
+# и не собирать строки на каждый вызов. На производительность SQLite это не влияет:
+# каждая функция открывает новое соединение, и кэш выражений между вызовами не живет.
+
+# Явно указываем колонки ордеров в правильном порядке
+_ORDER_COLUMNS = (
+    "id",
+    "telegram_id",
+    "order_id",
+    "market_id",
+    "market_title",
+    "token_id",
+    "token_name",
+    "side",
+    "current_price",
+    "target_price",
+    "offset_ticks",
+    "offset_cents",
+    "amount",
+    "status",
+    "reposition_threshold_cents",
+    "created_at",
+)
+_ORDER_COLUMNS_SQL = ", ".join(_ORDER_COLUMNS)
+
+_SQL_GET_USER = "SELECT * FROM users WHERE telegram_id = ?"
+
+# ON CONFLICT DO UPDATE обновляет строку на месте (в отличие от INSERT OR REPLACE,
+# который удаляет и вставляет заново) и сохраняет исходный created_at
+_SQL_UPSERT_USER = """
+INSERT INTO users
+(telegram_id, username, wallet_address, wallet_nonce,
+ private_key_cipher, private_key_nonce, api_key_cipher, api_key_nonce)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(telegram_id) DO UPDATE SET
+    username = excluded.username,
+    wallet_address = excluded.wallet_address,
+    wallet_nonce = excluded.wallet_nonce,
+    private_key_cipher = excluded.private_key_cipher,
+    private_key_nonce = excluded.private_key_nonce,
+    api_key_cipher = excluded.api_key_cipher,
+    api_key_nonce = excluded.api_key_nonce
+"""
+
+_SQL_GET_USER_ORDERS = f"""
+SELECT {_ORDER_COLUMNS_SQL} FROM orders
+WHERE telegram_id = ?
+ORDER BY created_at DESC
+"""
+
+_SQL_GET_USER_ORDERS_BY_STATUS = f"""
+SELECT {_ORDER_COLUMNS_SQL} FROM orders
+WHERE telegram_id = ? AND status = ?
+ORDER BY created_at DESC
+"""
+
+# Пользователи с активными ордерами (JOIN отсекает ордера удаленных пользователей)
+_SQL_GET_USERS_WITH_PENDING_ORDERS = """
+SELECT DISTINCT o.telegram_id FROM orders o
+JOIN users u ON u.telegram_id = o.telegram_id
+WHERE o.status = 'pending'
+"""
+
+_SQL_GET_ORDER_BY_ID = f"""
+SELECT {_ORDER_COLUMNS_SQL} FROM orders
+WHERE order_id = ?
+"""
+
 
 async def init_database():
     """Инициализирует базу данных SQLite."""
@@ -178,10 +251,14 @@ async def get_user(telegram_id: int) -> Optional[dict]:
     Returns:
         dict: Словарь с данными пользователя или None, если пользователь не найден
     """
+    # Данные пользователя меняются только при регистрации/удалении,
+    # поэтому сначала проверяем кэш (инвалидируется в save_user/delete_user)
+    cached = user_cache.get(telegram_id)
+    if cached is not None:
+        return dict(cached)
+
     async with aiosqlite.connect(DB_PATH) as conn:
-        async with conn.execute(
-            "SELECT * FROM users WHERE telegram_id = ?", (telegram_id,)
-        ) as cursor:
+        async with conn.execute(_SQL_GET_USER, (telegram_id,)) as cursor:
             row = await cursor.fetchone()
 
     if not row:
@@ -193,13 +270,15 @@ async def get_user(telegram_id: int) -> Optional[dict]:
         private_key = decrypt(row[4], row[5])
         api_key = decrypt(row[6], row[7])
 
-        return {
+        user = {
             "telegram_id": row[0],
             "username": row[1],
             "wallet_address": wallet_address,
             "private_key": private_key,
             "api_key": api_key,
         }
+        user_cache.set(telegram_id, user)
+        return dict(user)
     except Exception as e:
         logger.error(f"Ошибка расшифровки данных пользователя {telegram_id}: {e}")
         return None
@@ -230,12 +309,7 @@ async def save_user(
 
         # Сохраняем или обновляем пользователя
         await conn.execute(
-            """
-            INSERT OR REPLACE INTO users 
-            (telegram_id, username, wallet_address, wallet_nonce, 
-             private_key_cipher, private_key_nonce, api_key_cipher, api_key_nonce)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+            _SQL_UPSERT_USER,
             (
                 telegram_id,
                 username,
@@ -249,6 +323,7 @@ async def save_user(
         )
 
         await conn.commit()
+    user_cache.pop(telegram_id)
     logger.info(f"Пользователь {telegram_id} сохранен в базу данных")
 
 
@@ -330,51 +405,19 @@ async def get_user_orders(telegram_id: int, status: Optional[str] = None) -> lis
     Returns:
         list: Список словарей с данными ордеров
     """
-    # Явно указываем колонки в правильном порядке
-    columns = [
-        "id",
-        "telegram_id",
-        "order_id",
-        "market_id",
-        "market_title",
-        "token_id",
-        "token_name",
-        "side",
-        "current_price",
-        "target_price",
-        "offset_ticks",
-        "offset_cents",
-        "amount",
-        "status",
-        "reposition_threshold_cents",
-        "created_at",
-    ]
-
     async with aiosqlite.connect(DB_PATH) as conn:
         if status:
             async with conn.execute(
-                f"""
-                SELECT {", ".join(columns)} FROM orders 
-                WHERE telegram_id = ? AND status = ?
-                ORDER BY created_at DESC
-            """,
-                (telegram_id, status),
+                _SQL_GET_USER_ORDERS_BY_STATUS, (telegram_id, status)
             ) as cursor:
                 rows = await cursor.fetchall()
         else:
-            async with conn.execute(
-                f"""
-                SELECT {", ".join(columns)} FROM orders 
-                WHERE telegram_id = ?
-                ORDER BY created_at DESC
-            """,
-                (telegram_id,),
-            ) as cursor:
+            async with conn.execute(_SQL_GET_USER_ORDERS, (telegram_id,)) as cursor:
                 rows = await cursor.fetchall()
 
     orders = []
     for row in rows:
-        order_dict = dict(zip(columns, row))
+        order_dict = dict(zip(_ORDER_COLUMNS, row))
         orders.append(order_dict)
 
     return orders
@@ -390,40 +433,14 @@ async def get_order_by_id(order_id: str) -> Optional[dict]:
     Returns:
         dict: Словарь с данными ордера или None, если ордер не найден
     """
-    # Явно указываем колонки в правильном порядке
-    columns = [
-        "id",
-        "telegram_id",
-        "order_id",
-        "market_id",
-        "market_title",
-        "token_id",
-        "token_name",
-        "side",
-        "current_price",
-        "target_price",
-        "offset_ticks",
-        "offset_cents",
-        "amount",
-        "status",
-        "reposition_threshold_cents",
-        "created_at",
-    ]
-
     async with aiosqlite.connect(DB_PATH) as conn:
-        async with conn.execute(
-            f"""
-            SELECT {", ".join(columns)} FROM orders 
-            WHERE order_id = ?
-        """,
-            (order_id,),
-        ) as cursor:
+        async with conn.execute(_SQL_GET_ORDER_BY_ID, (order_id,)) as cursor:
             row = await cursor.fetchone()
 
     if not row:
         return None
 
-    order_dict = dict(zip(columns, row))
+    order_dict = dict(zip(_ORDER_COLUMNS, row))
     return order_dict
 
 
@@ -464,24 +481,54 @@ async def update_order_in_db(
         new_current_price: Новая текущая цена
         new_target_price: Новая целевая цена
     """
+    await update_orders_in_db(
+        [(old_order_id, new_order_id, new_current_price, new_target_price)]
+    )
+
+
+async def update_orders_in_db(updates: list) -> None:
+    """
+    Обновляет order_id и цены нескольких ордеров в БД одной транзакцией.
+
+    Args:
+        updates: Список кортежей
+            (old_order_id, new_order_id, new_current_price, new_target_price)
+    """
+    if not updates:
+        return
+
     async with aiosqlite.connect(DB_PATH) as conn:
-        await conn.execute(
+        await conn.executemany(
             """
             UPDATE orders 
             SET order_id = ?, current_price = ?, target_price = ?
             WHERE order_id = ?
         """,
-            (new_order_id, new_current_price, new_target_price, old_order_id),
+            [
+                (new_order_id, new_current_price, new_target_price, old_order_id)
+                for (
+                    old_order_id,
+                    new_order_id,
+                    new_current_price,
+                    new_target_price,
+                ) in updates
+            ],
         )
 
         await conn.commit()
-    logger.info(f"Обновлен ордер {old_order_id} -> {new_order_id} в БД")
+    for old_order_id, new_order_id, _, _ in updates:
+        logger.info(f"Обновлен ордер {old_order_id} -> {new_order_id} в БД")
+
 
+async def get_users_with_pending_orders() -> list:
+    """
+    Получает telegram_id пользователей, у которых есть активные ордера.
 
-async def get_all_users():
-    """Получает список всех пользователей из БД."""
+    Одним запросом вместо перебора всех пользователей: синхронизации не нужно
+    создавать клиент и читать ордера пользователей без активных ордеров.
+    """
     async with aiosqlite.connect(DB_PATH) as conn:
-        async with conn.execute("SELECT telegram_id FROM users") as cursor:
+        async with conn.execute(_SQL_GET_USERS_WITH_PENDING_ORDERS) as cursor:
             rows = await cursor.fetchall()
     return [row[0] for row in rows]
 
@@ -526,6 +573,7 @@ async def delete_user(telegram_id: int) -> bool:
         await conn.execute("DELETE FROM users WHERE telegram_id = ?", (telegram_id,))
 
         await conn.commit()
+        user_cache.pop(telegram_id)
 
         logger.info(
             f"Пользователь {telegram_id} удален из БД (удалено {orders_deleted} ордеров, очищено {invites_cleared} инвайтов)"
@@ -533,6 +581,31 @@ async def delete_user(telegram_id: int) -> bool:
         return True
 
 
+def _contains_decrypted_value(rows: list, value: str, field_name: str) -> bool:
+    """
+    Проверяет, совпадает ли value с расшифрованным значением в одной из строк.
+
+    Args:
+        rows: Строки вида (cipher, nonce)
+        value: Искомое значение
+        field_name: Название поля (для логов)
+
+    Returns:
+        bool: True если значение найдено
+    """
+    for row in rows:
+        try:
+            if decrypt(row[0], row[1]) == value:
+                return True
+        except Exception as e:
+            logger.warning(
+                f"Ошибка при расшифровке {field_name} для проверки уникальности: {e}"
+            )
+            continue
+
+    return False
+
+
 async def check_wallet_address_exists(wallet_address: str) -> bool:
     """
     Проверяет, существует ли уже пользователь с таким wallet_address.
@@ -549,18 +622,10 @@ async def check_wallet_address_exists(wallet_address: str) -> bool:
         ) as cursor:
             rows = await cursor.fetchall()
 
-    for row in rows:
-        try:
-            existing_wallet = decrypt(row[0], row[1])
-            if existing_wallet == wallet_address:
-                return True
-        except Exception as e:
-            logger.warning(
-                f"Ошибка при расшифровке wallet_address для проверки уникальности: {e}"
-            )
-            continue
-
-    return False
+    # Расшифровка всех строк - CPU-нагрузка, выполняем вне event loop
+    return await asyncio.to_thread(
+        _contains_decrypted_value, rows, wallet_address, "wallet_address"
+    )
 
 
 async def check_private_key_exists(private_key: str) -> bool:
@@ -579,18 +644,10 @@ async def check_private_key_exists(private_key: str) -> bool:
         ) as cursor:
             rows = await cursor.fetchall()
 
-    for row in rows:
-        try:
-            existing_private_key = decrypt(row[0], row[1])
-            if existing_private_key == private_key:
-                return True
-        except Exception as e:
-            logger.warning(
-                f"Ошибка при расшифровке private_key для проверки уникальности: {e}"
-            )
-            continue
-
-    return False
+    # Расшифровка всех строк - CPU-нагрузка, выполняем вне event loop
+    return await asyncio.to_thread(
+        _contains_decrypted_value, rows, private_key, "private_key"
+    )
 
 
 async def check_api_key_exists(api_key: str) -> bool:
@@ -609,38 +666,40 @@ async def check_api_key_exists(api_key: str) -> bool:
         ) as cursor:
             rows = await cursor.fetchall()
 
-    for row in rows:
-        try:
-            existing_api_key = decrypt(row[0], row[1])
-            if existing_api_key == api_key:
-                return True
-        except Exception as e:
-            logger.warning(
-                f"Ошибка при расшифровке api_key для проверки уникальности: {e}"
-            )
-            continue
-
-    return False
+    # Расшифровка всех строк - CPU-нагрузка, выполняем вне event loop
+    return await asyncio.to_thread(
+        _contains_decrypted_value, rows, api_key, "api_key"
+    )
 
 
-async def export_table_to_csv(conn: aiosqlite.Connection, table_name: str) -> str:
+async def _fetch_table(conn: aiosqlite.Connection, table_name: str) -> tuple:
     """
-    Экспортирует одну таблицу в CSV формат.
+    Получает названия колонок и все строки таблицы.
 
     Args:
         conn: Соединение с базой данных
         table_name: Название таблицы
 
     Returns:
-        str: CSV содержимое в виде строки
+        tuple: (список названий колонок, список строк)
     """
     async with conn.execute(f"SELECT * FROM {table_name}") as cursor:
         rows = await cursor.fetchall()
         # Получаем названия колонок
         column_names = [description[0] for description in cursor.description]
 
-    # Создаем CSV в памяти
-    output = io.StringIO()
+    return column_names, rows
+
+
+def _write_csv(output, column_names: list, rows: list) -> None:
+    """
+    Записывает заголовки и строки таблицы в текстовый поток в формате CSV.
+
+    Args:
+        output: Текстовый поток для записи
+        column_names: Названия колонок
+        rows: Строки таблицы
+    """
     writer = csv.writer(output)
 
     # Записываем заголовки
@@ -658,9 +717,31 @@ async def export_table_to_csv(conn: aiosqlite.Connection, table_name: str) -> st
                 csv_row.append(value)
         writer.writerow(csv_row)
 
+
+def _rows_to_csv(column_names: list, rows: list) -> str:
+    """Формирует CSV строку из заголовков и строк таблицы."""
+    output = io.StringIO()
+    _write_csv(output, column_names, rows)
     return output.getvalue()
 
 
+async def export_table_to_csv(conn: aiosqlite.Connection, table_name: str) -> str:
+    """
+    Экспортирует одну таблицу в CSV формат.
+
+    Args:
+        conn: Соединение с базой данных
+        table_name: Название таблицы
+
+    Returns:
+        str: CSV содержимое в виде строки
+    """
+    column_names, rows = await _fetch_table(conn, table_name)
+
+    # Форматирование CSV выполняем вне event loop
+    return await asyncio.to_thread(_rows_to_csv, column_names, rows)
+
+
 async def export_users_to_csv() -> str:
     """
     Экспортирует таблицу users в CSV формат.
@@ -679,8 +760,8 @@ async def export_all_tables_to_zip() -> bytes:
     Returns:
         bytes: ZIP архив в виде байтов
     """
-    # Создаем ZIP архив в памяти
-    zip_buffer = io.BytesIO()
+    # Данные таблиц: название таблицы -> (колонки, строки) или исключение
+    tables_data: dict = {}
 
     async with aiosqlite.connect(DB_PATH) as conn:
         # Получаем список всех таблиц
@@ -692,23 +773,47 @@ async def export_all_tables_to_zip() -> bytes:
             tables = await cursor.fetchall()
             table_names = [row[0] for row in tables]
 
-        # Экспортируем каждую таблицу в CSV и добавляем в ZIP
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for table_name in table_names:
-                try:
-                    csv_content = await export_table_to_csv(conn, table_name)
-                    # Добавляем CSV файл в ZIP с именем таблицы
-                    zip_file.writestr(f"{table_name}.csv", csv_content.encode("utf-8"))
-                    logger.info(f"Экспортирована таблица {table_name}")
-                except Exception as e:
-                    logger.error(f"Ошибка при экспорте таблицы {table_name}: {e}")
-                    # Добавляем файл с ошибкой
-                    zip_file.writestr(
-                        f"{table_name}_error.txt", f"Error exporting table: {e}"
-                    )
-
-    zip_buffer.seek(0)
-    return zip_buffer.read()
+        for table_name in table_names:
+            try:
+                tables_data[table_name] = await _fetch_table(conn, table_name)
+            except Exception as e:
+                logger.error(f"Ошибка при экспорте таблицы {table_name}: {e}")
+                tables_data[table_name] = e
+
+    # Формирование CSV и сжатие архива выполняем вне event loop
+    return await asyncio.to_thread(_build_zip, tables_data)
+
+
+def _build_zip(tables_data: dict) -> bytes:
+    """
+    Собирает ZIP архив с CSV файлами таблиц в памяти.
+
+    CSV пишется сразу в запись архива (без промежуточной строки и ее копии в bytes).
+
+    Args:
+        tables_data: Словарь название таблицы -> (колонки, строки) или исключение
+
+    Returns:
+        bytes: ZIP архив в виде байтов
+    """
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for table_name, table_data in tables_data.items():
+            if isinstance(table_data, Exception):
+                # Добавляем файл с ошибкой
+                zip_file.writestr(
+                    f"{table_name}_error.txt", f"Error exporting table: {table_data}"
+                )
+                continue
+
+            column_names, rows = table_data
+            # Добавляем CSV файл в ZIP с именем таблицы
+            with zip_file.open(f"{table_name}.csv", "w") as entry:
+                with io.TextIOWrapper(entry, encoding="utf-8", newline="") as output:
+                    _write_csv(output, column_names, rows)
+            logger.info(f"Экспортирована таблица {table_name}")
+
+    return zip_buffer.getvalue()
 
 
 async def get_database_statistics() -> dict:
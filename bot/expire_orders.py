@@ -223,8 +223,5 @@ async def expire_old_orders(bot: Bot) -> dict:
         }
 
     except Exception as e:
-        logger.error(f"Ошибка при проверке старых ордеров: {e}")
-        import traceback
-
-        logger.error(traceback.format_exc())
+        logger.error(f"Ошибка при проверке старых ордеров: {e}", exc_info=True)
         return {"checked": 0, "expired": 0, "failed": 0}
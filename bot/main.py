@@ -10,17 +10,25 @@
 import asyncio
 import logging
 
+try:
+    # Более быстрый event loop (libuv); на Windows недоступен - используется asyncio
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Импортируем локальные модули
 from admin import admin_router
-from admin_notifications import AdminErrorAlertHandler, send_admin_notification_with_log
+from admin_notifications import AdminErrorAlertHandler
 from aiogram import Bot, Dispatcher, F, Router
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.types import CallbackQuery, Message
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage, SimpleEventIsolation
+from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram_dialog import DialogManager, StartMode, setup_dialogs
 from client_factory import create_client, setup_proxy
@@ -30,7 +38,7 @@ from dotenv import load_dotenv
 from expire_orders import expire_old_orders
 from help_text import HELP_TEXT, HELP_TEXT_CN, HELP_TEXT_ENG
 from logger_config import setup_root_logger
-from market_router import market_router
+from market_router import close_open_api_session, market_router
 from opinion_api_wrapper import (
     ORDER_STATUS_PENDING,
     get_my_orders,
@@ -38,6 +46,7 @@ from opinion_api_wrapper import (
     get_usdt_balance,
 )
 from orders_dialog import OrdersSG, orders_dialog
+from scheduling import sleep_until_next_run
 from spam_protection import AntiSpamMiddleware
 from start_router import start_router
 from sync_orders import async_sync_all_orders
@@ -55,7 +64,40 @@ logger = logging.getLogger(__name__)
 bot = Bot(
     token=settings.bot_token, default=DefaultBotProperties(parse_mode=ParseMode.HTML)
 )
-dp = Dispatcher(storage=MemoryStorage())
+
+
+# Время жизни FSM состояний и данных в Redis (секунды)
+FSM_STATE_TTL = 24 * 60 * 60
+
+
+def create_fsm_storage() -> tuple[BaseStorage, BaseEventIsolation]:
+    """
+    Создает хранилище FSM состояний и изоляцию событий.
+
+    Если указан REDIS_URL - состояния хранятся в Redis (переживают рестарт бота),
+    иначе - в памяти процесса. Изоляция событий обрабатывает апдейты
+    одного пользователя последовательно.
+    """
+    if settings.redis_url:
+        # with_destiny=True требуется для aiogram-dialog.
+        # TTL удаляет из Redis состояния брошенных диалогов (например, регистрации)
+        storage = RedisStorage.from_url(
+            settings.redis_url,
+            key_builder=DefaultKeyBuilder(with_destiny=True),
+            state_ttl=FSM_STATE_TTL,
+            data_ttl=FSM_STATE_TTL,
+        )
+        return storage, storage.create_isolation()
+
+    return MemoryStorage(), SimpleEventIsolation()
+
+
+# Время ожидания long polling запроса getUpdates (секунды).
+# Чем дольше ожидание, тем меньше пустых запросов к Telegram при простое бота.
+POLLING_TIMEOUT = 30
+
+storage, events_isolation = create_fsm_storage()
+dp = Dispatcher(storage=storage, events_isolation=events_isolation)
 router = Router()
 
 
@@ -116,10 +158,12 @@ async def cmd_check_account(message: Message):
         # Создаем клиент
         client = create_client(user)
 
-        # Получаем данные аккаунта
-        balance = await get_usdt_balance(client)
-        open_orders = await get_my_orders(client, status=ORDER_STATUS_PENDING)
-        positions = await get_my_positions(client, limit=100)
+        # Получаем данные аккаунта (независимые запросы выполняются параллельно)
+        balance, open_orders, positions = await asyncio.gather(
+            get_usdt_balance(client),
+            get_my_orders(client, status=ORDER_STATUS_PENDING),
+            get_my_positions(client, limit=100),
+        )
 
         # Подсчитываем количество открытых ордеров
         open_orders_count = len(open_orders) if open_orders else 0
@@ -159,20 +203,27 @@ async def cmd_check_account(message: Message):
         )
 
 
-@router.message(Command("help"))
-async def cmd_help(message: Message):
-    """Обработчик команды /help - инструкция по работе с ботом."""
-    logger.info(f"Команда /help от пользователя {message.from_user.id}")
-
-    # Создаем клавиатуру с кнопками выбора языка
+def _build_help_lang_keyboard() -> InlineKeyboardMarkup:
+    """Создает клавиатуру с кнопками выбора языка инструкции."""
     builder = InlineKeyboardBuilder()
     builder.button(text="🇷🇺 Русский", callback_data="help_lang_ru")
     builder.button(text="🇬🇧 English", callback_data="help_lang_eng")
     builder.button(text="🇨🇳 中文", callback_data="help_lang_cn")
     builder.adjust(3)
+    return builder.as_markup()
+
+
+# Клавиатура не меняется - создаем один раз при импорте
+HELP_LANG_KEYBOARD = _build_help_lang_keyboard()
+
+
+@router.message(Command("help"))
+async def cmd_help(message: Message):
+    """Обработчик команды /help - инструкция по работе с ботом."""
+    logger.info(f"Команда /help от пользователя {message.from_user.id}")
 
     await message.answer(
-        HELP_TEXT_ENG, parse_mode="HTML", reply_markup=builder.as_markup()
+        HELP_TEXT_ENG, parse_mode="HTML", reply_markup=HELP_LANG_KEYBOARD
     )
 
 
@@ -191,16 +242,9 @@ async def process_help_lang(callback: CallbackQuery):
     else:
         text = HELP_TEXT
 
-    # Создаем клавиатуру с кнопками выбора языка
-    builder = InlineKeyboardBuilder()
-    builder.button(text="🇷🇺 Русский", callback_data="help_lang_ru")
-    builder.button(text="🇬🇧 English", callback_data="help_lang_eng")
-    builder.button(text="🇨🇳 中文", callback_data="help_lang_cn")
-    builder.adjust(3)
-
     try:
         await callback.message.edit_text(
-            text, parse_mode="HTML", reply_markup=builder.as_markup()
+            text, parse_mode="HTML", reply_markup=HELP_LANG_KEYBOARD
         )
     except Exception as e:
         logger.error(f"Ошибка при обновлении текста инструкции: {e}")
@@ -308,6 +352,19 @@ Use the /support command to contact administrator."""
 # ============================================================================
 
 
+# Ссылки на фоновые задачи: event loop хранит только слабые ссылки на задачи,
+# и задача без сильной ссылки может быть собрана GC посреди работы
+_background_tasks: set[asyncio.Task] = set()
+
+
+def start_background_task(coro) -> asyncio.Task:
+    """Запускает фоновую задачу и хранит ссылку на нее до завершения."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
 async def background_sync_task():
     """Фоновая задача для периодической синхронизации ордеров."""
     # Ждем 30 секунд после старта бота перед первой синхронизацией
@@ -315,28 +372,20 @@ async def background_sync_task():
 
     # Интервал синхронизации: 60 секунд (1 минута)
     SYNC_INTERVAL = 60
-    # Таймаут для цикла синхронизации (секунды)
-    SYNC_TIMEOUT = 180
 
+    loop = asyncio.get_running_loop()
+    next_run = loop.time() + SYNC_INTERVAL
     while True:
         try:
-            await asyncio.wait_for(async_sync_all_orders(bot), timeout=SYNC_TIMEOUT)
-        except asyncio.TimeoutError:
-            logger.error(
-                f"Sync cycle timeout exceeded ({SYNC_TIMEOUT}s). "
-                "Sending notification to admin."
-            )
-            timeout_message = (
-                "🚨 <b>Sync Cycle Timeout</b>\n\n"
-                f"Order sync exceeded {SYNC_TIMEOUT} seconds.\n"
-                "The task will continue in the next cycle."
-            )
-            await send_admin_notification_with_log(bot, timeout_message)
+            # Таймаут задается для каждого пользователя внутри async_sync_all_orders
+            await async_sync_all_orders(bot)
         except Exception as e:
             logger.error(f"Error in background sync task: {e}")
 
-        # Ждем перед следующей синхронизацией
-        await asyncio.sleep(SYNC_INTERVAL)
+        # Ждем следующей синхронизации по расписанию
+        next_run = await sleep_until_next_run(
+            loop, next_run, SYNC_INTERVAL, "Order sync"
+        )
 
 
 async def background_expire_orders_task():
@@ -347,14 +396,18 @@ async def background_expire_orders_task():
     # Интервал проверки: 24 часа (86400 секунд)
     EXPIRE_INTERVAL = 86400
 
+    loop = asyncio.get_running_loop()
+    next_run = loop.time() + EXPIRE_INTERVAL
     while True:
         try:
             await expire_old_orders(bot)
         except Exception as e:
             logger.error(f"Error in background expire orders task: {e}")
 
-        # Ждем перед следующей проверкой (24 часа)
-        await asyncio.sleep(EXPIRE_INTERVAL)
+        # Ждем следующей проверки по расписанию (24 часа)
+        next_run = await sleep_until_next_run(
+            loop, next_run, EXPIRE_INTERVAL, "Expire orders"
+        )
 
 
 async def main():
@@ -372,13 +425,14 @@ async def main():
     logging.getLogger("sync_orders").addHandler(error_alert_handler)
     logger.info("Admin error alert handler registered")
 
-    # Регистрируем middleware для антиспама (глобально)
-    dp.message.middleware(AntiSpamMiddleware(bot=bot))
-    dp.callback_query.middleware(AntiSpamMiddleware(bot=bot))
+    # Регистрируем middleware для антиспама (глобально, один раз на апдейт)
+    dp.update.outer_middleware(AntiSpamMiddleware(bot=bot))
 
-    # Регистрируем middleware для действия печатания (глобально)
-    dp.message.middleware(TypingMiddleware(bot=bot))
-    dp.callback_query.middleware(TypingMiddleware(bot=bot))
+    # Регистрируем middleware для действия печатания как внутренний: он вызывается
+    # только после того, как фильтры обработчика совпали
+    typing_middleware = TypingMiddleware(bot=bot)
+    dp.message.middleware(typing_middleware)
+    dp.callback_query.middleware(typing_middleware)
 
     # Регистрируем диалоги
     dp.include_router(orders_dialog)
@@ -392,12 +446,16 @@ async def main():
     dp.include_router(admin_router)  # Admin commands router
     dp.include_router(router)  # Main router (orders, help, support, etc.)
 
+    # Типы апдейтов вычисляем один раз, после регистрации всех роутеров
+    allowed_updates = dp.resolve_used_update_types()
+    logger.info(f"Allowed updates: {', '.join(allowed_updates)}")
+
     # Запускаем фоновую задачу синхронизации ордеров
-    asyncio.create_task(background_sync_task())
+    start_background_task(background_sync_task())
     logger.info("Background sync task started")
 
     # Запускаем фоновую задачу проверки старых ордеров
-    asyncio.create_task(background_expire_orders_task())
+    start_background_task(background_expire_orders_task())
     logger.info("Background expire orders task started")
 
     # Отправляем сообщение админу при старте (если указан)
@@ -413,8 +471,21 @@ async def main():
             logger.warning(f"Failed to send startup notification to admin: {e}")
 
     logger.info("Бот запущен")
-    await dp.start_polling(bot)
+    try:
+        # Получаем только те типы апдейтов, для которых есть обработчики
+        await dp.start_polling(
+            bot,
+            allowed_updates=allowed_updates,
+            polling_timeout=POLLING_TIMEOUT,
+        )
+    finally:
+        await close_open_api_session()
+        await events_isolation.close()
+        await storage.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
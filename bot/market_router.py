@@ -5,25 +5,31 @@ Handles the complete order placement process from URL input to order confirmatio
 
 import asyncio
 import hashlib
+import heapq
 import json
 import logging
-import traceback
+import math
+import time
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
 from typing import Optional, Tuple
-from urllib.error import HTTPError, URLError
 from urllib.parse import parse_qs, quote, urlparse
-from urllib.request import Request, urlopen
 
+import aiohttp
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from cache import InflightRequests, market_cache, orderbook_cache
 from client_factory import create_client
 from config import TICK_SIZE
 from database import get_user, get_user_orders, save_order
-from opinion_api_wrapper import get_usdt_balance
+from opinion_api_wrapper import get_usdt_balance, invalidate_balance_cache
 from opinion_clob_sdk import Client
 from opinion_clob_sdk.chain.py_order_utils.model.order import PlaceOrderDataInput
 from opinion_clob_sdk.chain.py_order_utils.model.order_type import LIMIT_ORDER
@@ -31,6 +37,60 @@ from opinion_clob_sdk.chain.py_order_utils.model.sides import OrderSide
 
 logger = logging.getLogger(__name__)
 
+# Допустимый диапазон цены по требованиям API (включительно, не 1.0!)
+MIN_PRICE = 0.001
+MAX_PRICE = 0.999
+
+# Кэш успешных проверок approve: (telegram_id, token_id) -> время истечения (monotonic).
+# Пока запись актуальна, place_order не делает повторную on-chain проверку approve.
+APPROVAL_CACHE_TTL = 24 * 60 * 60
+_APPROVAL_CACHE: dict[tuple[int, str], float] = {}
+
+CANCEL_MESSAGE = """❌ Order placement cancelled
+
+Use the /make_market command to start a new farm.
+Use the /orders command to manage your orders.
+Use the /check_account command to view account statistics.
+Use the /help command to view instructions.
+Use the /support command to contact administrator."""
+
+CLIENT_ERROR_MESSAGE = "❌ Failed to create API client. Please try again: /make_market"
+PLACING_ORDER_MESSAGE = "🔄 Placing order..."
+
+ORDER_PLACED_TEMPLATE = """✅ <b>Order successfully placed!</b>
+
+📋 <b>Final Information:</b>
+• Side: {direction} {token_name}
+• Price: {target_price:.6f}
+• Amount: {amount} USDT
+• Offset: {offset_cents:.2f}¢
+• Reposition threshold: {reposition_threshold_cents:.2f}¢
+• Order ID: <code>{order_id}</code>"""
+
+ORDER_FAILED_TEMPLATE = """❌ <b>Failed to place order</b>
+
+{error}"""
+DEFAULT_ORDER_ERROR_HINT = "Please check your balance and order parameters."
+
+# Opinion OpenAPI: общая HTTP-сессия с keep-alive соединениями
+OPEN_API_BASE_URL = "https://openapi.opinion.trade"
+OPEN_API_TIMEOUT = 10
+# Максимум одновременных соединений к OpenAPI (все запросы идут на один хост)
+OPEN_API_MAX_CONNECTIONS = 20
+_open_api_session: Optional[aiohttp.ClientSession] = None
+
+# Ссылки на фоновые задачи отправки сообщений (чтобы их не собрал GC)
+_pending_tasks: set[asyncio.Task] = set()
+
+
+def _run_in_background(coro) -> asyncio.Task:
+    """Запускает корутину в фоне, сохраняя ссылку на задачу до ее завершения."""
+    task = asyncio.create_task(coro)
+    _pending_tasks.add(task)
+    task.add_done_callback(_pending_tasks.discard)
+    return task
+
+
 # ============================================================================
 # States for market order placement
 # ============================================================================
@@ -49,13 +109,51 @@ class MarketOrderStates(StatesGroup):
     waiting_confirm = State()
 
 
+# ============================================================================
+# Static keyboards (built once at import)
+# ============================================================================
+
+
+def _build_cancel_keyboard() -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text="✖️ Cancel", callback_data="cancel")
+    return builder.as_markup()
+
+
+def _build_side_keyboard() -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text="✅ YES", callback_data="side_yes")
+    builder.button(text="❌ NO", callback_data="side_no")
+    builder.button(text="✖️ Cancel", callback_data="cancel")
+    builder.adjust(2)
+    return builder.as_markup()
+
+
+def _build_confirm_keyboard() -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text="✅ Place Order", callback_data="confirm_yes")
+    builder.button(text="✖️ Cancel", callback_data="cancel")
+    builder.adjust(2)
+    return builder.as_markup()
+
+
+CANCEL_KEYBOARD = _build_cancel_keyboard()
+SIDE_KEYBOARD = _build_side_keyboard()
+CONFIRM_KEYBOARD = _build_confirm_keyboard()
+
+
 # ============================================================================
 # Helper functions for market operations
 # ============================================================================
 
 
+@lru_cache(maxsize=1024)
 def parse_market_url(url: str) -> Tuple[Optional[int], Optional[str], Optional[str]]:
-    """Parses Opinion.trade URL and extracts marketId, market type, and slug."""
+    """
+    Parses Opinion.trade URL and extracts marketId, market type, and slug.
+
+    Результат кэшируется: пользователи часто повторно отправляют ту же ссылку.
+    """
     try:
         parsed = urlparse(url)
         params = parse_qs(parsed.query)
@@ -100,22 +198,51 @@ def normalize_market_type(market_type_value: object) -> Optional[str]:
     return None
 
 
+def _get_open_api_session() -> aiohttp.ClientSession:
+    """
+    Returns the shared HTTP session for Opinion OpenAPI requests.
+
+    The session is created lazily (it must be created inside the running event loop)
+    and keeps connections alive between requests, so repeated requests skip
+    TCP and TLS setup. trust_env=True makes it use the HTTP(S)_PROXY variables
+    set by setup_proxy().
+    """
+    global _open_api_session
+    if _open_api_session is None or _open_api_session.closed:
+        _open_api_session = aiohttp.ClientSession(
+            base_url=OPEN_API_BASE_URL,
+            timeout=aiohttp.ClientTimeout(total=OPEN_API_TIMEOUT),
+            connector=aiohttp.TCPConnector(
+                limit=OPEN_API_MAX_CONNECTIONS, ttl_dns_cache=300
+            ),
+            raise_for_status=True,
+            trust_env=True,
+        )
+    return _open_api_session
+
+
+async def close_open_api_session() -> None:
+    """Closes the shared OpenAPI HTTP session (called on bot shutdown)."""
+    global _open_api_session
+    if _open_api_session is not None:
+        await _open_api_session.close()
+        _open_api_session = None
+
+
 async def resolve_market_by_slug(
     api_key: str, slug: str
 ) -> Tuple[Optional[int], Optional[str]]:
     """Resolves marketId and market type by slug using Opinion OpenAPI."""
-    def _fetch():
-        url = f"https://openapi.opinion.trade/openapi/market/slug/{quote(slug)}"
-        request = Request(url, headers={"apikey": api_key, "Accept": "application/json"})
-        with urlopen(request, timeout=10) as response:
-            status = getattr(response, "status", None)
-            return status, response.read()
-
     try:
-        status, raw = await asyncio.to_thread(_fetch)
+        session = _get_open_api_session()
+        async with session.get(
+            f"/openapi/market/slug/{quote(slug)}",
+            headers={"apikey": api_key, "Accept": "application/json"},
+        ) as response:
+            raw = await response.read()
         raw_text = raw.decode("utf-8", errors="replace")
         payload = json.loads(raw_text)
-    except (HTTPError, URLError) as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         logger.error(f"Error resolving market slug '{slug}': {e}")
         return None, None
     except Exception as e:
@@ -161,16 +288,47 @@ async def resolve_market_by_slug(
     return market_id, market_type
 
 
+# Одновременные запросы одного рынка выполняются одним запросом к SDK
+_market_requests = InflightRequests()
+
+
 async def get_market_info(client: Client, market_id: int, is_categorical: bool = False):
-    """Gets market information."""
+    """Gets market information (from cache if it is fresh enough)."""
+    cache_key = (market_id, is_categorical)
+    market = market_cache.get(cache_key)
+    if market is not None:
+        return market
+
+    return await _market_requests.run(
+        cache_key, lambda: _fetch_market_info(client, market_id, is_categorical)
+    )
+
+
+def invalidate_market(market_id: int) -> None:
+    """Removes cached market information (both binary and categorical entries)."""
+    market_cache.pop((market_id, False))
+    market_cache.pop((market_id, True))
+
+
+async def _fetch_market_info(client: Client, market_id: int, is_categorical: bool):
+    """Requests market information from API and stores it in cache."""
+    cache_key = (market_id, is_categorical)
     try:
+        # Синхронные вызовы SDK выполняем в потоке, чтобы не блокировать event loop
         if is_categorical:
-            response = client.get_categorical_market(market_id=market_id)
+            response = await asyncio.to_thread(
+                client.get_categorical_market, market_id=market_id
+            )
         else:
-            response = client.get_market(market_id=market_id, use_cache=True)
+            response = await asyncio.to_thread(
+                client.get_market, market_id=market_id, use_cache=True
+            )
 
         if response.errno == 0:
-            return response.result.data
+            market = response.result.data
+            if market is not None:
+                market_cache.set(cache_key, market)
+            return market
         else:
             logger.error(
                 f"Error getting market: {response.errmsg} (code: {response.errno})"
@@ -181,6 +339,21 @@ async def get_market_info(client: Client, market_id: int, is_categorical: bool =
         return None
 
 
+# Имена атрибутов submarket в порядке приоритета (SDK отдает разные модели)
+_SUBMARKET_ID_ATTRS = ("market_id", "id")
+_SUBMARKET_TITLE_ATTRS = ("market_title", "title", "name")
+_MISSING = object()
+
+
+def _first_attr(obj, names: Tuple[str, ...], default):
+    """Returns value of the first existing attribute from names, or default."""
+    for name in names:
+        value = getattr(obj, name, _MISSING)
+        if value is not _MISSING:
+            return value
+    return default
+
+
 def get_categorical_market_submarkets(market) -> list:
     """Extracts list of submarkets from categorical market."""
     if hasattr(market, "child_markets") and market.child_markets:
@@ -188,39 +361,68 @@ def get_categorical_market_submarkets(market) -> list:
     return []
 
 
-async def get_orderbooks(client: Client, yes_token_id: str, no_token_id: str):
-    """Gets order books for YES and NO tokens."""
-    yes_orderbook = None
-    no_orderbook = None
+@dataclass(slots=True)
+class Orderbook:
+    """Order book of a token: bid and ask levels (objects with price and size)."""
+
+    bids: list
+    asks: list
 
-    try:
-        response = client.get_orderbook(token_id=yes_token_id)
-        if response.errno == 0:
-            yes_orderbook = (
-                response.result
-                if hasattr(response.result, "bids")
-                else getattr(response.result, "data", response.result)
-            )
-    except Exception as e:
-        logger.error(f"Error getting orderbook for YES: {e}")
 
+def _to_orderbook(result) -> Orderbook:
+    """Converts SDK response result (result itself or result.data) to Orderbook."""
+    raw = result if hasattr(result, "bids") else getattr(result, "data", result)
+    return Orderbook(
+        bids=list(getattr(raw, "bids", None) or []),
+        asks=list(getattr(raw, "asks", None) or []),
+    )
+
+
+# Одновременные запросы стакана одного токена (например, несколько пользователей
+# открыли один рынок) объединяются в один запрос к API
+_orderbook_requests = InflightRequests()
+
+
+async def _get_orderbook(client: Client, token_id: str, token_name: str):
+    """Gets order book for a token (from cache if it is fresh enough)."""
+    orderbook = orderbook_cache.get(token_id)
+    if orderbook is not None:
+        return orderbook
+
+    return await _orderbook_requests.run(
+        token_id, lambda: _fetch_orderbook(client, token_id, token_name)
+    )
+
+
+async def _fetch_orderbook(client: Client, token_id: str, token_name: str):
+    """Requests order book for a token from API and stores it in cache."""
     try:
-        response = client.get_orderbook(token_id=no_token_id)
+        response = await asyncio.to_thread(client.get_orderbook, token_id=token_id)
         if response.errno == 0:
-            no_orderbook = (
-                response.result
-                if hasattr(response.result, "bids")
-                else getattr(response.result, "data", response.result)
-            )
+            orderbook = _to_orderbook(response.result)
+            orderbook_cache.set(token_id, orderbook)
+            return orderbook
     except Exception as e:
-        logger.error(f"Error getting orderbook for NO: {e}")
+        logger.error(f"Error getting orderbook for {token_name}: {e}")
+
+    return None
+
+
+async def get_orderbooks(client: Client, yes_token_id: str, no_token_id: str):
+    """Gets order books for YES and NO tokens (both requests run concurrently)."""
+    yes_orderbook, no_orderbook = await asyncio.gather(
+        _get_orderbook(client, yes_token_id, "YES"),
+        _get_orderbook(client, no_token_id, "NO"),
+    )
 
     return yes_orderbook, no_orderbook
 
 
-def calculate_spread_and_liquidity(orderbook, token_name: str) -> dict:
+def calculate_spread_and_liquidity(
+    orderbook: Optional[Orderbook], token_name: str
+) -> dict:
     """Calculates spread and liquidity for a token."""
-    if not orderbook:
+    if orderbook is None:
         return {
             "best_bid": None,
             "best_ask": None,
@@ -232,22 +434,38 @@ def calculate_spread_and_liquidity(orderbook, token_name: str) -> dict:
             "total_liquidity": 0,
         }
 
-    bids = orderbook.bids if hasattr(orderbook, "bids") else []
-    asks = orderbook.asks if hasattr(orderbook, "asks") else []
+    bids = orderbook.bids
+    asks = orderbook.asks
 
-    # Extract best bid (highest price)
-    best_bid = None
-    if bids and len(bids) > 0:
-        bid_prices = [float(bid.price) for bid in bids if hasattr(bid, "price")]
-        if bid_prices:
-            best_bid = max(bid_prices)  # Highest bid
-
-    # Extract best ask (lowest price)
-    best_ask = None
-    if asks and len(asks) > 0:
-        ask_prices = [float(ask.price) for ask in asks if hasattr(ask, "price")]
-        if ask_prices:
-            best_ask = min(ask_prices)  # Lowest ask
+    # Один проход по каждой стороне: лучшая цена + ликвидность топ-5 уровней
+    best_bid = float("-inf")  # Highest bid
+    bid_liquidity = 0.0
+    for i, bid in enumerate(bids):
+        try:
+            price = float(bid.price)
+            if price > best_bid:
+                best_bid = price
+            if i < 5:
+                bid_liquidity += float(bid.size)
+        except AttributeError:
+            continue
+
+    best_ask = float("inf")  # Lowest ask
+    ask_liquidity = 0.0
+    for i, ask in enumerate(asks):
+        try:
+            price = float(ask.price)
+            if price < best_ask:
+                best_ask = price
+            if i < 5:
+                ask_liquidity += float(ask.size)
+        except AttributeError:
+            continue
+
+    if best_bid == float("-inf"):
+        best_bid = None
+    if best_ask == float("inf"):
+        best_ask = None
 
     spread = None
     spread_pct = None
@@ -258,8 +476,6 @@ def calculate_spread_and_liquidity(orderbook, token_name: str) -> dict:
         mid_price = (best_bid + best_ask) / 2
         spread_pct = (spread / mid_price * 100) if mid_price > 0 else 0
 
-    bid_liquidity = sum(float(bid.size) for bid in bids[:5]) if bids else 0
-    ask_liquidity = sum(float(ask.size) for ask in asks[:5]) if asks else 0
     total_liquidity = bid_liquidity + ask_liquidity
 
     return {
@@ -274,6 +490,86 @@ def calculate_spread_and_liquidity(orderbook, token_name: str) -> dict:
     }
 
 
+def _fmt_cents(value: float) -> str:
+    """Formats value in cents with up to 2 decimals and without trailing zeros."""
+    return f"{round(value, 2):g}"
+
+
+_get_price = attrgetter("price")
+
+BEST_BIDS_HEADER = "Best 5 bids:"
+BEST_ASKS_HEADER = "Best 5 asks:"
+
+
+def _parse_level_prices(levels) -> list:
+    """Extracts valid prices (float) from orderbook levels, skipping malformed ones."""
+    if not levels:
+        return []
+
+    # Быстрый путь: ответ API корректный, исключений нет
+    try:
+        return [float(price) for price in map(_get_price, levels) if price is not None]
+    except (AttributeError, ValueError, TypeError):
+        pass
+
+    # Медленный путь: в стакане есть некорректные уровни - пропускаем их
+    prices = []
+    for level in levels:
+        try:
+            prices.append(float(level.price))
+        except (AttributeError, ValueError, TypeError):
+            continue
+    return prices
+
+
+def get_orderbook_top(orderbook: Optional[Orderbook], depth: int = 5) -> dict:
+    """
+    Extracts best levels and extremes from orderbook.
+
+    Returns:
+        dict: {"bids": [лучшие depth бидов по убыванию], "asks": [лучшие depth асков по возрастанию],
+               "min_bid": самый дальний бид, "max_ask": самый дальний аск}
+    """
+    bid_prices = _parse_level_prices(orderbook.bids if orderbook else None)
+    ask_prices = _parse_level_prices(orderbook.asks if orderbook else None)
+
+    # heapq выбирает топ-N за O(n) без сортировки всего стакана
+    return {
+        "bids": heapq.nlargest(depth, bid_prices),
+        "asks": heapq.nsmallest(depth, ask_prices),
+        "min_bid": min(bid_prices) if bid_prices else None,
+        "max_ask": max(ask_prices) if ask_prices else None,
+    }
+
+
+def format_price_levels(
+    header: str, prices_cents: list[float], tail_price_cents: Optional[float]
+) -> str:
+    """
+    Formats numbered orderbook levels (in cents) for a message.
+
+    The tail price (most distant level) is appended after "..." if it
+    is not already among the shown levels.
+    """
+    lines = [header]
+    lines.extend(f"{i}. {price:.1f} ¢" for i, price in enumerate(prices_cents, 1))
+    # Сравниваем по отображаемому значению (0.1¢), а не по точному float
+    shown = {round(price, 1) for price in prices_cents}
+    if tail_price_cents is not None and round(tail_price_cents, 1) not in shown:
+        lines.append(f"...\n{tail_price_cents:.1f} ¢")
+    return "\n".join(lines) + "\n"
+
+
+def count_whole_ticks(distance: float, tick_size: float = TICK_SIZE) -> int:
+    """
+    Returns number of whole ticks that fit into price distance.
+
+    Частное округляется до 6 знаков перед floor, чтобы погрешность float
+    не теряла тик: (0.011 - 0.001) / 0.001 = 9.999999999999998 -> 10, а не 9.
+    """
+    return max(0, math.floor(round(distance / tick_size, 6)))
+
+
 def calculate_target_price(
     current_price: float, side: str, offset_ticks: int, tick_size: float = TICK_SIZE
 ) -> Tuple[float, bool]:
@@ -282,28 +578,32 @@ def calculate_target_price(
 
     API requires price range: 0.001 - 0.999 (inclusive)
     """
-    MIN_PRICE = 0.001  # Minimum price per API requirements
-    MAX_PRICE = 0.999  # Maximum price per API requirements (not 1.0!)
+    delta = offset_ticks * tick_size
+    target = current_price - delta if side == "BUY" else current_price + delta
 
-    if side == "BUY":
-        target = current_price - offset_ticks * tick_size
-    else:  # SELL
-        target = current_price + offset_ticks * tick_size
+    # Limit to MIN_PRICE - MAX_PRICE range (0.001 - 0.999). The bounds have
+    # 3 decimals, so rounding after clamping cannot leave the range and
+    # the clamped price is always valid
+    target = round(min(MAX_PRICE, max(MIN_PRICE, target)), 3)
+    return target, True
 
-    # Limit to MIN_PRICE - MAX_PRICE range (0.001 - 0.999)
-    target = max(MIN_PRICE, min(MAX_PRICE, target))
-    is_valid = MIN_PRICE <= target <= MAX_PRICE
-    target = round(target, 3)
 
-    # Check that after rounding the price is still in valid range
-    if target < MIN_PRICE:
-        target = MIN_PRICE
-        is_valid = True
-    elif target > MAX_PRICE:
-        target = MAX_PRICE
-        is_valid = True
+async def get_user_client(telegram_id: int) -> Optional[Client]:
+    """
+    Creates Opinion SDK client for a registered user.
 
-    return target, is_valid
+    Клиент не хранится в FSM state (он не сериализуется), поэтому
+    на каждом шаге, где он нужен, создается заново из данных пользователя.
+    """
+    user = await get_user(telegram_id)
+    if not user:
+        return None
+
+    try:
+        return create_client(user)
+    except Exception as e:
+        logger.error(f"Ошибка создания клиента для пользователя {telegram_id}: {e}")
+        return None
 
 
 async def check_usdt_balance(
@@ -323,8 +623,7 @@ async def check_usdt_balance(
         available = await get_usdt_balance(client)
         return available >= required_amount, available
     except Exception as e:
-        logger.error(f"Error checking balance: {e}")
-        logger.error(traceback.format_exc())
+        logger.error(f"Error checking balance: {e}", exc_info=True)
         return False, 0.0
 
 
@@ -338,22 +637,25 @@ async def place_order(
         Tuple[bool, Optional[str], Optional[str]]: (success, order_id, error_message)
     """
     try:
-        client.enable_trading()
+        approval_key = (order_params.get("telegram_id"), order_params["token_id"])
+        approval_cached = _APPROVAL_CACHE.get(approval_key, 0.0) > time.monotonic()
 
-        price = float(order_params["price"])
-        price_rounded = round(price, 3)  # API requires max 3 decimal places
+        if not approval_cached:
+            await asyncio.to_thread(client.enable_trading)
 
-        # Additional validation: API requires range 0.001 - 0.999 (inclusive)
-        MIN_PRICE = 0.001
-        MAX_PRICE = 0.999
+        # API requires max 3 decimal places: работаем с ценой в целых тиках 0.001
+        price_ticks = round(float(order_params["price"]) * 1000)
 
-        if price_rounded < MIN_PRICE:
-            error_msg = f"Price {price_rounded} is less than minimum {MIN_PRICE}"
+        # Additional validation: API requires range 0.001 - 0.999 (inclusive)
+        if price_ticks < 1:
+            error_msg = f"Price {price_ticks / 1000} is less than minimum {MIN_PRICE}"
             logger.error(error_msg)
             return False, None, error_msg
 
-        if price_rounded > MAX_PRICE:
-            error_msg = f"Price {price_rounded} is greater than maximum {MAX_PRICE}"
+        if price_ticks > 999:
+            error_msg = (
+                f"Price {price_ticks / 1000} is greater than maximum {MAX_PRICE}"
+            )
             logger.error(error_msg)
             return False, None, error_msg
 
@@ -362,17 +664,30 @@ async def place_order(
             tokenId=order_params["token_id"],
             side=order_params["side"],
             orderType=LIMIT_ORDER,
-            price=str(price_rounded),
+            price=f"0.{price_ticks:03d}",
             makerAmountInQuoteToken=order_params["amount"],
         )
 
-        # Обертываем синхронный вызов API в asyncio.to_thread, чтобы не блокировать event loop
-        def _place_order_sync():
-            return client.place_order(order_data, check_approval=True)
-
-        result = await asyncio.to_thread(_place_order_sync)
+        # Синхронный вызов SDK выполняется в потоке, чтобы не блокировать event loop
+        try:
+            result = await asyncio.to_thread(
+                client.place_order, order_data, check_approval=not approval_cached
+            )
+        except Exception as e:
+            if not approval_cached or "approv" not in str(e).lower():
+                raise
+            # Закэшированный approve мог устареть - сбрасываем кэш и повторяем с проверкой
+            logger.warning(f"Approval error with cached approval, retrying: {e}")
+            _APPROVAL_CACHE.pop(approval_key, None)
+            result = await asyncio.to_thread(
+                client.place_order, order_data, check_approval=True
+            )
 
         if result.errno == 0:
+            _APPROVAL_CACHE[approval_key] = time.monotonic() + APPROVAL_CACHE_TTL
+            # Ордер зарезервировал часть баланса - кэшированное значение устарело
+            invalidate_balance_cache(client)
+
             order_id = "N/A"
             if hasattr(result, "result"):
                 if hasattr(result.result, "order_data"):
@@ -389,6 +704,10 @@ async def place_order(
                 if hasattr(result, "errmsg") and result.errmsg
                 else f"Error code: {result.errno}"
             )
+            # При ошибке размещения не доверяем закэшированному approve и данным
+            # рынка: ошибка часто означает, что рынок закрыт или разрешен
+            _APPROVAL_CACHE.pop(approval_key, None)
+            invalidate_market(order_params["market_id"])
             logger.error(f"Error placing order: {error_msg}")
             return False, None, error_msg
     except Exception as e:
@@ -426,15 +745,11 @@ Currently, you can only have 1 active order at a time. Please wait for updates."
         )
         return
 
-    # Create keyboard with "Cancel" button
-    builder = InlineKeyboardBuilder()
-    builder.button(text="✖️ Cancel", callback_data="cancel")
-
     await message.answer(
         """📊 Place a Limit Order
 
 Please enter the Opinion.trade market link:""",
-        reply_markup=builder.as_markup(),
+        reply_markup=CANCEL_KEYBOARD,
     )
     await state.set_state(MarketOrderStates.waiting_url)
 
@@ -484,11 +799,9 @@ Please contact administrator via /support and provide the error code above."""
         )
 
     if not market_id:
-        builder = InlineKeyboardBuilder()
-        builder.button(text="✖️ Cancel", callback_data="cancel")
         await message.answer(
             """❌ Failed to extract Market ID from URL. Please try again:""",
-            reply_markup=builder.as_markup(),
+            reply_markup=CANCEL_KEYBOARD,
         )
         return
 
@@ -523,16 +836,12 @@ Please contact administrator via /support and provide the error code above."""
         # Build submarket list for selection
         submarket_list = []
         for i, subm in enumerate(submarkets, 1):
-            submarket_id = getattr(subm, "market_id", getattr(subm, "id", None))
-            title = getattr(
-                subm,
-                "market_title",
-                getattr(subm, "title", getattr(subm, "name", f"Submarket {i}")),
-            )
-            submarket_list.append({"id": submarket_id, "title": title, "data": subm})
+            submarket_id = _first_attr(subm, _SUBMARKET_ID_ATTRS, None)
+            title = _first_attr(subm, _SUBMARKET_TITLE_ATTRS, None) or f"Submarket {i}"
+            submarket_list.append({"id": submarket_id, "title": title})
 
-        # Save submarket list and client to state
-        await state.update_data(submarkets=submarket_list, client=client)
+        # Save submarket list to state
+        await state.update_data(submarkets=submarket_list)
 
         # Create keyboard for submarket selection
         builder = InlineKeyboardBuilder()
@@ -562,9 +871,6 @@ Select a submarket:""",
         await state.clear()
         return
 
-    # Save client to state
-    await state.update_data(client=client)
-
     # Continue processing regular market
     await process_market_data(
         message, state, market, market_id, client, yes_token_id, no_token_id
@@ -586,17 +892,11 @@ async def process_market_data(
     )
 
     # Check if order books have orders
-    yes_has_orders = (
-        yes_orderbook
-        and hasattr(yes_orderbook, "bids")
-        and hasattr(yes_orderbook, "asks")
-        and (len(yes_orderbook.bids) > 0 or len(yes_orderbook.asks) > 0)
+    yes_has_orders = yes_orderbook is not None and bool(
+        yes_orderbook.bids or yes_orderbook.asks
     )
-    no_has_orders = (
-        no_orderbook
-        and hasattr(no_orderbook, "bids")
-        and hasattr(no_orderbook, "asks")
-        and (len(no_orderbook.bids) > 0 or len(no_orderbook.asks) > 0)
+    no_has_orders = no_orderbook is not None and bool(
+        no_orderbook.bids or no_orderbook.asks
     )
 
     if not yes_has_orders and not no_has_orders:
@@ -619,14 +919,14 @@ Possible reasons:
     # Save data to state
     await state.update_data(
         market_id=market_id,
-        market=market,
+        market_title=getattr(market, "market_title", None),
         yes_token_id=yes_token_id,
         no_token_id=no_token_id,
-        yes_orderbook=yes_orderbook,
-        no_orderbook=no_orderbook,
+        # None - стакан не получен (process_side сообщит об ошибке загрузки)
+        yes_top=get_orderbook_top(yes_orderbook) if yes_orderbook else None,
+        no_top=get_orderbook_top(no_orderbook) if no_orderbook else None,
         yes_info=yes_info,
         no_info=no_info,
-        client=client,
     )
 
     # Format market information in new format
@@ -676,10 +976,6 @@ Possible reasons:
 
         market_info_parts.append("\n".join(no_lines))
 
-    # Create keyboard with "Cancel" button
-    builder = InlineKeyboardBuilder()
-    builder.button(text="✖️ Cancel", callback_data="cancel")
-
     # Format full message with empty line between blocks
     market_info_text = "\n\n".join(market_info_parts) if market_info_parts else ""
 
@@ -690,7 +986,7 @@ Possible reasons:
 {market_info_text}
 
 💰 Enter the amount for farming (in USDT, e.g. 10):""",
-        reply_markup=builder.as_markup(),
+        reply_markup=CANCEL_KEYBOARD,
     )
     await state.set_state(MarketOrderStates.waiting_amount)
 
@@ -722,7 +1018,13 @@ async def process_submarket(callback: CallbackQuery, state: FSMContext):
             return
 
         # Get full information about selected submarket
-        client = data["client"]
+        client = await get_user_client(callback.from_user.id)
+        if not client:
+            await callback.message.edit_text(CLIENT_ERROR_MESSAGE)
+            await state.clear()
+            await callback.answer()
+            return
+
         await callback.message.edit_text(
             f"""📊 Getting submarket information: {selected_submarket["title"]}..."""
         )
@@ -775,16 +1077,17 @@ async def process_amount(message: Message, state: FSMContext):
         amount = float(message.text.strip())
 
         if amount <= 0:
-            builder = InlineKeyboardBuilder()
-            builder.button(text="✖️ Cancel", callback_data="cancel")
             await message.answer(
                 """❌ Amount must be a positive number. Please try again:""",
-                reply_markup=builder.as_markup(),
+                reply_markup=CANCEL_KEYBOARD,
             )
             return
 
-        data = await state.get_data()
-        client = data["client"]
+        client = await get_user_client(message.from_user.id)
+        if not client:
+            await message.answer(CLIENT_ERROR_MESSAGE)
+            await state.clear()
+            return
 
         # Check balance
         has_balance, current_balance = await check_usdt_balance(client, amount)
@@ -804,26 +1107,17 @@ async def process_amount(message: Message, state: FSMContext):
 
         await state.update_data(amount=amount)
 
-        # Create keyboard for side selection
-        builder = InlineKeyboardBuilder()
-        builder.button(text="✅ YES", callback_data="side_yes")
-        builder.button(text="❌ NO", callback_data="side_no")
-        builder.button(text="✖️ Cancel", callback_data="cancel")
-        builder.adjust(2)
-
         await message.answer(
             f"""✅ USDT balance is sufficient to place a BUY order for {amount} USDT
 
 📈 Select side:""",
-            reply_markup=builder.as_markup(),
+            reply_markup=SIDE_KEYBOARD,
         )
         await state.set_state(MarketOrderStates.waiting_side)
     except ValueError:
-        builder = InlineKeyboardBuilder()
-        builder.button(text="✖️ Cancel", callback_data="cancel")
         await message.answer(
             """❌ Invalid amount format. Enter a number:""",
-            reply_markup=builder.as_markup(),
+            reply_markup=CANCEL_KEYBOARD,
         )
 
 
@@ -840,12 +1134,12 @@ async def process_side(callback: CallbackQuery, state: FSMContext):
         token_id = data["yes_token_id"]
         token_name = "YES"
         current_price = data["yes_info"]["mid_price"]
-        orderbook = data.get("yes_orderbook")
+        orderbook_top = data.get("yes_top")
     else:
         token_id = data["no_token_id"]
         token_name = "NO"
         current_price = data["no_info"]["mid_price"]
-        orderbook = data.get("no_orderbook")
+        orderbook_top = data.get("no_top")
 
     if not current_price:
         await callback.message.answer(
@@ -855,65 +1149,23 @@ async def process_side(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    if not orderbook:
+    if not orderbook_top:
         await callback.message.answer("❌ Failed to get orderbook for selected token")
         await state.clear()
         await callback.answer()
         return
 
-    # Extract bids and asks from orderbook
-    bids = orderbook.bids if hasattr(orderbook, "bids") else []
-    asks = orderbook.asks if hasattr(orderbook, "asks") else []
-
-    # Sort bids by descending price (highest first)
-    sorted_bids = []
-    if bids and len(bids) > 0:
-        for bid in bids:
-            if hasattr(bid, "price"):
-                try:
-                    price = float(bid.price)
-                    sorted_bids.append((price, bid))
-                except (ValueError, TypeError):
-                    continue
-        sorted_bids.sort(key=lambda x: x[0], reverse=True)
-
-    # Sort asks by ascending price (lowest first)
-    sorted_asks = []
-    if asks and len(asks) > 0:
-        for ask in asks:
-            if hasattr(ask, "price"):
-                try:
-                    price = float(ask.price)
-                    sorted_asks.append((price, ask))
-                except (ValueError, TypeError):
-                    continue
-        sorted_asks.sort(key=lambda x: x[0])
-
-    # Get best 5 bids (highest prices)
-    best_bids = []
-    for i, (price, bid) in enumerate(sorted_bids[:5]):
-        price_cents = price * 100
-        best_bids.append(price_cents)
-
-    # Get best 5 asks (lowest prices)
-    best_asks = []
-    for i, (price, ask) in enumerate(sorted_asks[:5]):
-        price_cents = price * 100
-        best_asks.append(price_cents)
-
-    # Find maximum distant bid (lowest of all bids)
-    last_bid = None
-    if sorted_bids:
-        last_bid_price = sorted_bids[-1][0]
-        last_bid = last_bid_price * 100
-
-    # Find maximum distant ask (highest of all asks)
-    last_ask = None
-    if sorted_asks:
-        last_ask_price = sorted_asks[-1][0]
-        last_ask = last_ask_price * 100
-
-    # Best bid (highest) - first in sorted list
+    # Best 5 bids (highest prices) and best 5 asks (lowest prices) in cents
+    best_bids = [price * 100 for price in orderbook_top["bids"]]
+    best_asks = [price * 100 for price in orderbook_top["asks"]]
+
+    # Maximum distant bid (lowest of all bids) and ask (highest of all asks)
+    min_bid = orderbook_top["min_bid"]
+    max_ask = orderbook_top["max_ask"]
+    last_bid = min_bid * 100 if min_bid is not None else None
+    last_ask = max_ask * 100 if max_ask is not None else None
+
+    # Best bid (highest) - first in best bids list
     best_bid = best_bids[0] if best_bids else None
 
     if not best_bid:
@@ -924,44 +1176,32 @@ async def process_side(callback: CallbackQuery, state: FSMContext):
 
     # Calculate maximum tick values for BUY and SELL
     tick_size = TICK_SIZE
-    MIN_PRICE = 0.001
-    MAX_PRICE = 0.999
 
     # For BUY: so price doesn't become < MIN_PRICE (0.001)
-    max_offset_buy = int((current_price - MIN_PRICE) / tick_size)
+    max_offset_buy = count_whole_ticks(current_price - MIN_PRICE, tick_size)
 
     # For SELL: so price doesn't become > MAX_PRICE (0.999)
-    max_offset_sell = int((MAX_PRICE - current_price) / tick_size)
+    max_offset_sell = count_whole_ticks(MAX_PRICE - current_price, tick_size)
 
     min_offset = 0
 
-    await state.update_data(
-        token_id=token_id,
-        token_name=token_name,
-        current_price=current_price,
-        tick_size=tick_size,
-        max_offset_buy=max_offset_buy,
-        max_offset_sell=max_offset_sell,
-        best_bid=best_bid,
+    # data уже прочитан в начале хендлера - записываем состояние одним set_data
+    # (update_data повторно читает состояние из хранилища)
+    await state.set_data(
+        {
+            **data,
+            "token_id": token_id,
+            "token_name": token_name,
+            "current_price": current_price,
+            "tick_size": tick_size,
+            "max_offset_buy": max_offset_buy,
+            "max_offset_sell": max_offset_sell,
+            "best_bid": best_bid,
+        }
     )
 
-    # Format text with best bids
-    bids_text = "Best 5 bids:\n"
-    for i, bid_price in enumerate(best_bids, 1):
-        bids_text += f"{i}. {bid_price:.1f} ¢\n"
-    if last_bid and last_bid not in best_bids:
-        bids_text += f"...\n{last_bid:.1f} ¢\n"
-
-    # Format text with best asks
-    asks_text = "Best 5 asks:\n"
-    for i, ask_price in enumerate(best_asks, 1):
-        asks_text += f"{i}. {ask_price:.1f} ¢\n"
-    if last_ask and last_ask not in best_asks:
-        asks_text += f"...\n{last_ask:.1f} ¢\n"
-
-    # Create keyboard with "Cancel" button
-    builder = InlineKeyboardBuilder()
-    builder.button(text="✖️ Cancel", callback_data="cancel")
+    bids_text = format_price_levels(BEST_BIDS_HEADER, best_bids, last_bid)
+    asks_text = format_price_levels(BEST_ASKS_HEADER, best_asks, last_ask)
 
     await callback.message.edit_text(
         f"""✅ Selected: {token_name}
@@ -971,7 +1211,7 @@ async def process_side(callback: CallbackQuery, state: FSMContext):
 {bids_text}
 {asks_text}
 Set the price offset (in ¢) relative to the best bid ({best_bid:.1f}¢). For example 0.1:""",
-        reply_markup=builder.as_markup(),
+        reply_markup=CANCEL_KEYBOARD,
     )
     await callback.answer()
     await state.set_state(MarketOrderStates.waiting_offset_ticks)
@@ -983,15 +1223,21 @@ async def process_offset_ticks(message: Message, state: FSMContext):
     Handles offset input in cents.
     User enters offset in cents, we convert to ticks for validation and further processing.
     """
+    # Читаем состояние один раз и заранее считаем значения в центах
+    data = await state.get_data()
+    tick_size = data.get("tick_size", TICK_SIZE)
+    tick_size_cents = tick_size * 100
+    max_offset_buy = data.get("max_offset_buy", 0)
+    max_offset_sell = data.get("max_offset_sell", 0)
+    # Maximum value (take max of BUY and SELL)
+    max_offset = max(max_offset_buy, max_offset_sell)
+    max_offset_cents = max_offset * tick_size_cents
+
     try:
         offset_cents = float(message.text.strip())
 
-        data = await state.get_data()
         best_bid = data.get("best_bid")
         current_price = data["current_price"]
-        tick_size = data.get("tick_size", TICK_SIZE)
-        max_offset_buy = data.get("max_offset_buy", 0)
-        max_offset_sell = data.get("max_offset_sell", 0)
 
         if not best_bid:
             await message.answer("❌ Error: best bid not found")
@@ -999,36 +1245,30 @@ async def process_offset_ticks(message: Message, state: FSMContext):
             return
 
         # Convert offset in cents to ticks
-        offset_ticks = int(round(offset_cents / (100 * tick_size)))
+        offset_ticks = round(offset_cents / tick_size_cents)
 
         # Validation: check value is in valid range
-        builder = InlineKeyboardBuilder()
-        builder.button(text="✖️ Cancel", callback_data="cancel")
-
         min_offset = 0
         if offset_ticks < min_offset:
             await message.answer(
                 f"❌ Offset must be at least {min_offset} cents.\n"
-                f"Enter a value from {min_offset} to {max(max_offset_buy, max_offset_sell) * tick_size * 100:.1f} cents:",
-                reply_markup=builder.as_markup(),
+                f"Enter a value from {min_offset} to {max_offset_cents:.1f} cents:",
+                reply_markup=CANCEL_KEYBOARD,
             )
             return
 
-        # Check maximum value (take max of BUY and SELL)
-        max_offset = max(max_offset_buy, max_offset_sell)
-        max_offset_cents = max_offset * tick_size * 100
-
+        # Check maximum value
         if offset_ticks > max_offset:
             await message.answer(
                 f"❌ Offset is too large!\n\n"
-                f"• Maximum for BUY: {max_offset_buy * tick_size * 100:.1f} cents\n"
-                f"• Maximum for SELL: {max_offset_sell * tick_size * 100:.1f} cents\n\n"
+                f"• Maximum for BUY: {max_offset_buy * tick_size_cents:.1f} cents\n"
+                f"• Maximum for SELL: {max_offset_sell * tick_size_cents:.1f} cents\n\n"
                 f"Enter a value from {min_offset} to {max_offset_cents:.1f} cents:",
-                reply_markup=builder.as_markup(),
+                reply_markup=CANCEL_KEYBOARD,
             )
             return
 
-        await state.update_data(offset_ticks=offset_ticks)
+        await state.set_data({**data, "offset_ticks": offset_ticks})
 
         # Create keyboard for direction selection
         builder = InlineKeyboardBuilder()
@@ -1058,11 +1298,10 @@ async def process_offset_ticks(message: Message, state: FSMContext):
 
         # Convert prices to cents for display
         current_price_cents = current_price * 100
-        tick_size_cents = tick_size * 100
 
         # Format without trailing zeros
-        current_price_str = f"{current_price_cents:.2f}".rstrip("0").rstrip(".")
-        tick_size_str = f"{tick_size_cents:.2f}".rstrip("0").rstrip(".")
+        current_price_str = _fmt_cents(current_price_cents)
+        tick_size_str = _fmt_cents(tick_size_cents)
 
         await message.answer(
             f"""✅ Offset: {offset_cents:.1f}¢ ({offset_ticks} ticks)
@@ -1076,17 +1315,9 @@ Select order direction:""",
         )
         await state.set_state(MarketOrderStates.waiting_direction)
     except ValueError:
-        data = await state.get_data()
-        tick_size = data.get("tick_size", TICK_SIZE)
-        max_offset_buy = data.get("max_offset_buy", 0)
-        max_offset_sell = data.get("max_offset_sell", 0)
-        max_offset = max(max_offset_buy, max_offset_sell)
-        max_offset_cents = max_offset * tick_size * 100
-        builder = InlineKeyboardBuilder()
-        builder.button(text="✖️ Cancel", callback_data="cancel")
         await message.answer(
             f"❌ Invalid format. Enter a number from 0 to {max_offset_cents:.1f} cents:",
-            reply_markup=builder.as_markup(),
+            reply_markup=CANCEL_KEYBOARD,
         )
 
 
@@ -1141,16 +1372,9 @@ Offset {offset_ticks} ticks is too large for current price {current_price:.6f}""
         await callback.answer()
         return
 
-    order_side = OrderSide.BUY if direction == "BUY" else OrderSide.SELL
-
-    await state.update_data(
-        direction=direction, order_side=order_side, target_price=target_price
-    )
+    await state.set_data({**data, "direction": direction, "target_price": target_price})
 
     # Ask for reposition threshold
-    builder = InlineKeyboardBuilder()
-    builder.button(text="✖️ Cancel", callback_data="cancel")
-
     await callback.message.edit_text(
         """⚙️ <b>Reposition Threshold</b>
 
@@ -1164,37 +1388,32 @@ For example:
 Recommended: <code>0.5</code> cents
 
 Enter the threshold:""",
-        reply_markup=builder.as_markup(),
+        reply_markup=CANCEL_KEYBOARD,
     )
     await callback.answer()
     await state.set_state(MarketOrderStates.waiting_reposition_threshold)
 
 
+# "confirm_no" - отказ на шаге подтверждения обрабатывается как обычная отмена,
+# но только в состоянии подтверждения (устаревшая кнопка не сбрасывает другое состояние)
 @market_router.callback_query(F.data == "cancel")
+@market_router.callback_query(F.data == "confirm_no", MarketOrderStates.waiting_confirm)
 async def process_cancel(callback: CallbackQuery, state: FSMContext):
     """
     Universal handler for 'Cancel' button for all order placement states.
     Works in all MarketOrderStates.
     """
+    # Cancellation notice and instructions are sent as one message (one API call)
     try:
         # Try to edit message (if it's an inline button)
-        await callback.message.edit_text("❌ Order placement cancelled")
-    except Exception:
-        # If editing failed, send new message
-        await callback.message.answer("❌ Order placement cancelled")
+        await callback.message.edit_text(CANCEL_MESSAGE)
+    except TelegramBadRequest:
+        # Message can't be edited - send new message in background
+        _run_in_background(callback.message.answer(CANCEL_MESSAGE))
 
     await state.clear()
     await callback.answer()
 
-    # Send instruction message
-    await callback.message.answer(
-        """Use the /make_market command to start a new farm.
-Use the /orders command to manage your orders.
-Use the /check_account command to view account statistics.
-Use the /help command to view instructions.
-Use the /support command to contact administrator."""
-    )
-
 
 @market_router.message(MarketOrderStates.waiting_reposition_threshold)
 async def process_reposition_threshold(message: Message, state: FSMContext):
@@ -1204,20 +1423,15 @@ async def process_reposition_threshold(message: Message, state: FSMContext):
 
         # Validation: must be positive
         if threshold_cents <= 0:
-            builder = InlineKeyboardBuilder()
-            builder.button(text="✖️ Cancel", callback_data="cancel")
             await message.answer(
                 "❌ Threshold must be a positive number.\n\nEnter the threshold in cents (e.g., 0.5):",
-                reply_markup=builder.as_markup(),
+                reply_markup=CANCEL_KEYBOARD,
             )
             return
 
-        # Save threshold to state
-        await state.update_data(reposition_threshold_cents=threshold_cents)
-
-        # Get all data for confirmation
-        data = await state.get_data()
-        market = data["market"]
+        # Save threshold to state and get all data for confirmation
+        data = await state.update_data(reposition_threshold_cents=threshold_cents)
+        market_title = data.get("market_title")
         token_name = data["token_name"]
         direction = data["direction"]
         current_price = data["current_price"]
@@ -1234,14 +1448,14 @@ async def process_reposition_threshold(message: Message, state: FSMContext):
         target_price_cents = target_price * 100
 
         # Format prices without trailing zeros
-        current_price_str = f"{current_price_cents:.2f}".rstrip("0").rstrip(".")
-        target_price_str = f"{target_price_cents:.2f}".rstrip("0").rstrip(".")
-        offset_cents_str = f"{offset_cents:.2f}".rstrip("0").rstrip(".")
+        current_price_str = _fmt_cents(current_price_cents)
+        target_price_str = _fmt_cents(target_price_cents)
+        offset_cents_str = _fmt_cents(offset_cents)
 
         confirm_text = f"""📋 <b>Settings Confirmation</b>
 
 📊 <b>Market:</b>
-Name: {market.market_title}
+Name: {market_title}
 Outcome: {token_name}
 
 💰 <b>Farm settings:</b>
@@ -1253,59 +1467,60 @@ Reposition threshold: {threshold_cents:.2f}¢
 
 Amount: {amount} USDT"""
 
-        builder = InlineKeyboardBuilder()
-        builder.button(text="✅ Place Order", callback_data="confirm_yes")
-        builder.button(text="✖️ Cancel", callback_data="cancel")
-        builder.adjust(2)
-
-        await message.answer(confirm_text, reply_markup=builder.as_markup())
+        await message.answer(confirm_text, reply_markup=CONFIRM_KEYBOARD)
         await state.set_state(MarketOrderStates.waiting_confirm)
 
     except ValueError:
-        builder = InlineKeyboardBuilder()
-        builder.button(text="✖️ Cancel", callback_data="cancel")
         await message.answer(
             "❌ Invalid format. Enter a number (e.g., 0.5 for 0.5 cents):",
-            reply_markup=builder.as_markup(),
+            reply_markup=CANCEL_KEYBOARD,
         )
 
 
 @market_router.callback_query(
-    F.data.startswith("confirm_"), MarketOrderStates.waiting_confirm
+    F.data == "confirm_yes", MarketOrderStates.waiting_confirm
 )
 async def process_confirm(callback: CallbackQuery, state: FSMContext):
     """Handles order placement confirmation."""
-    confirm = callback.data.split("_")[1]
-
-    if confirm != "yes":
-        await callback.message.edit_text("""❌ Order placement cancelled""")
+    data = await state.get_data()
+    client = await get_user_client(callback.from_user.id)
+    if not client:
+        await callback.message.edit_text(CLIENT_ERROR_MESSAGE)
         await state.clear()
         await callback.answer()
         return
 
-    data = await state.get_data()
-    client = data["client"]
+    order_side = OrderSide.BUY if data["direction"] == "BUY" else OrderSide.SELL
 
     order_params = {
+        "telegram_id": callback.from_user.id,
         "market_id": data["market_id"],
         "token_id": data["token_id"],
-        "side": data["order_side"],
+        "side": order_side,
         "price": str(data["target_price"]),
         "amount": data["amount"],
         "token_name": data["token_name"],
     }
 
-    await callback.message.edit_text("""🔄 Placing order...""")
+    # The progress message is cosmetic: send it while the order is being placed
+    placing_message = _run_in_background(
+        callback.message.edit_text(PLACING_ORDER_MESSAGE)
+    )
 
     success, order_id, error_message = await place_order(client, order_params)
 
+    # Wait for the progress message so it doesn't overwrite the result
+    try:
+        await placing_message
+    except Exception as e:
+        logger.warning(f"Failed to show placing order message: {e}")
+
     if success:
         # Save order to database
         try:
             telegram_id = callback.from_user.id
             market_id = data["market_id"]
-            market = data.get("market")
-            market_title = getattr(market, "market_title", None) if market else None
+            market_title = data.get("market_title")
             token_id = data["token_id"]
             token_name = data["token_name"]
             side = data["direction"]  # BUY or SELL
@@ -1341,21 +1556,20 @@ async def process_confirm(callback: CallbackQuery, state: FSMContext):
             logger.error(f"Error saving order to DB: {e}")
 
         await callback.message.edit_text(
-            f"""✅ <b>Order successfully placed!</b>
-
-📋 <b>Final Information:</b>
-• Side: {data["direction"]} {data["token_name"]}
-• Price: {data["target_price"]:.6f}
-• Amount: {data["amount"]} USDT
-• Offset: {offset_cents:.2f}¢
-• Reposition threshold: {reposition_threshold_cents:.2f}¢
-• Order ID: <code>{order_id}</code>"""
+            ORDER_PLACED_TEMPLATE.format(
+                direction=data["direction"],
+                token_name=data["token_name"],
+                target_price=data["target_price"],
+                amount=data["amount"],
+                offset_cents=offset_cents,
+                reposition_threshold_cents=reposition_threshold_cents,
+                order_id=order_id,
+            )
         )
     else:
-        error_text = f"""❌ <b>Failed to place order</b>
-
-{error_message if error_message else "Please check your balance and order parameters."}"""
-        await callback.message.edit_text(error_text)
+        await callback.message.edit_text(
+            ORDER_FAILED_TEMPLATE.format(error=error_message or DEFAULT_ORDER_ERROR_HINT)
+        )
 
     await state.clear()
     await callback.answer()
@@ -66,9 +66,11 @@
 """
 
 import asyncio
-import traceback
-from typing import Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
 
+from cache import InflightRequests, balance_cache
 from config import USDT_CONTRACT_ADDRESS
 from logger_config import setup_logger
 
@@ -76,6 +78,21 @@ from logger_config import setup_logger
 # так как opinion_api_wrapper используется в основном из sync_orders
 logger = setup_logger("opinion_api_wrapper", "sync_orders.log")
 
+# Адрес контракта USDT в нижнем регистре
+# (quote_token из ответа API сравнивается без учета регистра)
+_USDT_ADDRESS_LOWER = USDT_CONTRACT_ADDRESS.lower()
+
+# Отдельный пул потоков для синхронных вызовов SDK: всплески запросов к API
+# не конкурируют с другими пользователями пула по умолчанию (asyncio.to_thread)
+SDK_MAX_WORKERS = 8
+_sdk_executor = ThreadPoolExecutor(
+    max_workers=SDK_MAX_WORKERS, thread_name_prefix="opinion-sdk"
+)
+
+# Одновременные запросы одного ордера: (api_key, order_id) -> общий запрос
+_order_requests = InflightRequests()
+
+
 # Константы для статусов ордеров (числовые коды из API)
 ORDER_STATUS_PENDING = (
     "1"  # Открытый/активный ордер (status_enum='Pending', соответствует 'pending')
@@ -88,6 +105,12 @@ ORDER_STATUS_CANCELED = (
 )
 
 
+async def _run_sdk(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Выполняет синхронный вызов SDK в пуле _sdk_executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_sdk_executor, partial(func, *args, **kwargs))
+
+
 async def get_my_orders(
     client, market_id: int = 0, status: str = "", limit: int = 10, page: int = 1
 ) -> List[Any]:
@@ -121,6 +144,9 @@ async def get_my_orders(
         - status=ORDER_STATUS_FINISHED (2), status_enum='Finished' → исполненный ордер (finished)
         - status=ORDER_STATUS_CANCELED (3), status_enum='Canceled' → отмененный ордер (canceled)
     """
+    if limit <= 0:
+        return []
+
     try:
         # Формируем параметры для запроса
         params = {
@@ -130,14 +156,14 @@ async def get_my_orders(
             "page": page,
         }
 
-        logger.info(
+        logger.debug(
             f"Запрос ордеров из API: market_id={market_id}, status={status}, limit={limit}, page={page}"
         )
 
-        # Вызываем API в отдельном потоке, так как SDK синхронный
-        response = await asyncio.to_thread(client.get_my_orders, **params)
+        # Вызываем API в пуле потоков SDK, так как SDK синхронный
+        response = await _run_sdk(client.get_my_orders, **params)
 
-        logger.info(
+        logger.debug(
             f"API Response: errno={response.errno}, errmsg={getattr(response, 'errmsg', 'N/A')}"
         )
 
@@ -160,13 +186,12 @@ async def get_my_orders(
         # Возвращаем список объектов ордеров со всеми полями
         order_list = response.result.list
         order_count = len(order_list) if order_list else 0
-        logger.info(f"Получено {order_count} ордеров из API")
+        logger.debug(f"Получено {order_count} ордеров из API")
 
         return order_list if order_list else []
 
     except Exception as e:
-        logger.error(f"Исключение при получении ордеров из API: {e}")
-        logger.error(traceback.format_exc())
+        logger.error(f"Исключение при получении ордеров из API: {e}", exc_info=True)
         return []
 
 
@@ -174,6 +199,9 @@ async def get_order_by_id(client, order_id: str) -> Optional[Any]:
     """
     Получает ордер по его ID из API (асинхронная версия).
 
+    Одновременные запросы одного ордера (от одного аккаунта) выполняются
+    одним запросом к API. Результат не кэшируется.
+
     Args:
         client: Клиент Opinion SDK
         order_id: ID ордера (строка)
@@ -184,11 +212,17 @@ async def get_order_by_id(client, order_id: str) -> Optional[Any]:
         market_title, price, side, side_enum, outcome, order_amount,
         filled_amount, maker_amount, created_at, и другие.
     """
+    key = (getattr(client, "api_key", None), order_id)
+    return await _order_requests.run(key, lambda: _fetch_order_by_id(client, order_id))
+
+
+async def _fetch_order_by_id(client, order_id: str) -> Optional[Any]:
+    """Запрашивает ордер по ID из API (см. get_order_by_id)."""
     try:
         logger.info(f"Запрос ордера по ID из API: order_id={order_id}")
 
-        # Вызываем API в отдельном потоке, так как SDK синхронный
-        response = await asyncio.to_thread(client.get_order_by_id, order_id=order_id)
+        # Вызываем API в пуле потоков SDK, так как SDK синхронный
+        response = await _run_sdk(client.get_order_by_id, order_id=order_id)
 
         logger.info(
             f"API Response: errno={response.errno}, errmsg={getattr(response, 'errmsg', 'N/A')}"
@@ -233,71 +267,110 @@ async def get_order_by_id(client, order_id: str) -> Optional[Any]:
             logger.warning(
                 f"Таймаут при получении ордера из API (order_id={order_id}): {error_str}"
             )
-            logger.debug(f"Traceback для таймаута:\n{traceback.format_exc()}")
+            logger.debug("Traceback для таймаута", exc_info=True)
         else:
             # Другие ошибки - логируем как ERROR
             logger.error(
-                f"Исключение при получении ордера из API (order_id={order_id}): {e}"
+                f"Исключение при получении ордера из API (order_id={order_id}): {e}",
+                exc_info=True,
             )
-            logger.error(traceback.format_exc())
 
         return None
 
 
-async def get_usdt_balance(client) -> float:
+def _balance_cache_key(client) -> Optional[str]:
+    """Ключ кэша баланса: api_key аккаунта (клиенты создаются на каждый запрос)."""
+    return getattr(client, "api_key", None) or None
+
+
+def invalidate_balance_cache(client) -> None:
+    """Сбрасывает кэшированный баланс (после размещения или отмены ордеров)."""
+    key = _balance_cache_key(client)
+    if key is not None:
+        balance_cache.pop(key)
+
+
+async def get_balances_map(client) -> Optional[Dict[str, float]]:
     """
-    Получает баланс USDT пользователя из API (асинхронная версия).
+    Получает все балансы пользователя из API одним запросом.
+
+    Успешно полученные балансы кэшируются на BALANCE_CACHE_TTL секунд,
+    чтобы несколько проверок подряд не делали повторные запросы к API.
 
     Args:
         client: Клиент Opinion SDK
 
     Returns:
-        Баланс USDT в виде float. Возвращает 0.0 в случае ошибки.
+        Словарь {адрес токена в нижнем регистре: доступный баланс}
+        или None в случае ошибки.
     """
+    cache_key = _balance_cache_key(client)
+    if cache_key is not None:
+        cached = balance_cache.get(cache_key)
+        if cached is not None:
+            # Копия: изменения у вызывающего не должны портить кэш
+            return dict(cached)
+
     try:
-        # Вызываем API в отдельном потоке, так как SDK синхронный
-        response = await asyncio.to_thread(client.get_my_balances)
+        # Вызываем API в пуле потоков SDK, так как SDK синхронный
+        response = await _run_sdk(client.get_my_balances)
 
         # Проверяем ошибки
         if response.errno != 0:
             logger.warning(
                 f"Ошибка при получении баланса: errno={response.errno}, errmsg={getattr(response, 'errmsg', 'N/A')}"
             )
-            return 0.0
+            return None
 
         if not hasattr(response, "result") or not response.result:
             logger.warning("Ответ API не содержит result")
-            return 0.0
+            return None
 
         if not hasattr(response.result, "balances") or not response.result.balances:
             logger.warning("Ответ API не содержит balances")
-            return 0.0
+            return None
 
-        # Ищем баланс USDT в массиве балансов
-        # quote_token - это адрес контракта USDT (0x55d398326f99059ff775485246999027b3197955)
-        available = 0.0
+        # quote_token - адрес контракта токена, available_balance - строка.
+        # Некорректная запись пропускается и не мешает остальным токенам
+        balances = {}
         for balance in response.result.balances:
-            quote_token = getattr(balance, "quote_token", "")
-            if quote_token.lower() == USDT_CONTRACT_ADDRESS.lower():
-                available_balance_str = getattr(balance, "available_balance", "0")
-                available = float(available_balance_str)
-                break
-
-        if available == 0.0:
-            available_tokens = [
-                getattr(b, "quote_token", "unknown") for b in response.result.balances
-            ]
-            logger.warning(
-                f"USDT баланс не найден. Доступные токены: {available_tokens}"
-            )
-
-        return available
+            token = getattr(balance, "quote_token", None)
+            try:
+                balances[token.lower()] = float(
+                    getattr(balance, "available_balance", "0")
+                )
+            except (AttributeError, TypeError, ValueError) as e:
+                logger.warning(f"Пропущен некорректный баланс токена {token}: {e}")
+
+        if cache_key is not None:
+            balance_cache.set(cache_key, balances)
+        return dict(balances)
 
     except Exception as e:
-        logger.error(f"Исключение при получении баланса из API: {e}")
-        logger.error(traceback.format_exc())
+        logger.error(f"Исключение при получении баланса из API: {e}", exc_info=True)
+        return None
+
+
+async def get_usdt_balance(client) -> float:
+    """
+    Получает баланс USDT пользователя из API (асинхронная версия).
+
+    Args:
+        client: Клиент Opinion SDK
+
+    Returns:
+        Баланс USDT в виде float. Возвращает 0.0 в случае ошибки.
+    """
+    balances = await get_balances_map(client)
+    if balances is None:
         return 0.0
 
+    # Адрес контракта USDT: 0x55d398326f99059ff775485246999027b3197955
+    if _USDT_ADDRESS_LOWER not in balances:
+        logger.warning(f"USDT баланс не найден. Доступные токены: {list(balances)}")
+        return 0.0
+    return balances[_USDT_ADDRESS_LOWER]
+
 
 async def get_my_positions(client, limit: int = 100) -> List[Any]:
     """
@@ -312,13 +385,16 @@ async def get_my_positions(client, limit: int = 100) -> List[Any]:
         Каждый объект содержит поля: market_id, market_title, shares_owned,
         current_value_in_quote_token, outcome_side_enum, и другие.
     """
+    if limit <= 0:
+        return []
+
     try:
-        logger.info(f"Запрос позиций из API: limit={limit}")
+        logger.debug(f"Запрос позиций из API: limit={limit}")
 
-        # Вызываем API в отдельном потоке, так как SDK синхронный
-        response = await asyncio.to_thread(client.get_my_positions, limit=limit)
+        # Вызываем API в пуле потоков SDK, так как SDK синхронный
+        response = await _run_sdk(client.get_my_positions, limit=limit)
 
-        logger.info(
+        logger.debug(
             f"API Response: errno={response.errno}, errmsg={getattr(response, 'errmsg', 'N/A')}"
         )
 
@@ -340,11 +416,10 @@ async def get_my_positions(client, limit: int = 100) -> List[Any]:
         # Возвращаем список объектов позиций со всеми полями
         position_list = response.result.list
         position_count = len(position_list) if position_list else 0
-        logger.info(f"Получено {position_count} позиций из API")
+        logger.debug(f"Получено {position_count} позиций из API")
 
         return position_list if position_list else []
 
     except Exception as e:
-        logger.error(f"Исключение при получении позиций из API: {e}")
-        logger.error(traceback.format_exc())
+        logger.error(f"Исключение при получении позиций из API: {e}", exc_info=True)
         return []
@@ -23,6 +23,46 @@ class OrdersSG(StatesGroup):
     orders_search_results = State()
 
 
+# Эмодзи статусов ордеров
+STATUS_EMOJI = {"pending": "⏳", "canceled": "🔴", "finished": "✅"}
+
+
+def format_order_entry(i: int, order: dict) -> str:
+    """Форматирует один ордер для списка (i - сквозной номер по всем страницам)."""
+    order_id = order.get("order_id", "N/A")
+    market_id = order.get("market_id", "N/A")
+    market_title = order.get("market_title", "N/A")
+    token_name = order.get("token_name", "N/A")
+    side = order.get("side", "N/A")
+    target_price = order.get("target_price", 0)
+    amount = order.get("amount", 0)
+    status = order.get("status", "unknown")
+    # Нормализуем статус: приводим к нижнему регистру и убираем пробелы
+    status = str(status).lower().strip() if status else "unknown"
+    reposition_threshold_cents = float(order.get("reposition_threshold_cents"))
+
+    created_at = order.get("created_at")
+    # SQLite возвращает TIMESTAMP как строку в формате "YYYY-MM-DD HH:MM:SS"
+    # Берем первые 16 символов для формата "YYYY-MM-DD HH:MM"
+    date_str = created_at[:16] if created_at and len(str(created_at)) >= 16 else "N/A"
+
+    # Статус и направление с эмодзи
+    status_emoji = STATUS_EMOJI.get(status, "❓")
+    side_emoji = "📈" if side == "BUY" else "📉"
+
+    # Форматируем цену в центах
+    target_price_cents = target_price * 100
+    price_str = f"{target_price_cents:.2f}".rstrip("0").rstrip(".")
+
+    return f"""<b>{i}.</b> {status_emoji} {status.upper()} <code>{order_id}</code>
+   {side_emoji} {side} {token_name} | {price_str}¢ | {amount} USDT
+   📊 Market ID: {market_id} | {market_title[:25]}...
+   ⚙️ Reposition threshold: {reposition_threshold_cents:.2f}¢
+   📅 {date_str}
+
+"""
+
+
 # Обработчики для списка ордеров
 async def get_orders_list_data(dialog_manager: DialogManager, **kwargs):
     """Данные для списка ордеров с пагинацией."""
@@ -82,45 +122,10 @@ Page {current_page + 1} of {(total + items_per_page - 1) // items_per_page if to
     if not orders_page:
         text += "You have no orders yet."
     else:
-        for i, order in enumerate(orders_page, start_idx + 1):
-            order_id = order.get("order_id", "N/A")
-            market_id = order.get("market_id", "N/A")
-            market_title = order.get("market_title", "N/A")
-            token_name = order.get("token_name", "N/A")
-            side = order.get("side", "N/A")
-            target_price = order.get("target_price", 0)
-            amount = order.get("amount", 0)
-            status = order.get("status", "unknown")
-            # Нормализуем статус: приводим к нижнему регистру и убираем пробелы
-            status = str(status).lower().strip() if status else "unknown"
-            reposition_threshold_cents = float(order.get("reposition_threshold_cents"))
-
-            created_at = order.get("created_at")
-            # SQLite возвращает TIMESTAMP как строку в формате "YYYY-MM-DD HH:MM:SS"
-            # Берем первые 16 символов для формата "YYYY-MM-DD HH:MM"
-            date_str = (
-                created_at[:16] if created_at and len(str(created_at)) >= 16 else "N/A"
-            )
-
-            # Статус с эмодзи
-            status_emoji = {"pending": "⏳", "canceled": "🔴", "finished": "✅"}.get(
-                status, "❓"
-            )
-
-            # Направление с эмодзи
-            side_emoji = "📈" if side == "BUY" else "📉"
-
-            # Форматируем цену в центах
-            target_price_cents = target_price * 100
-            price_str = f"{target_price_cents:.2f}".rstrip("0").rstrip(".")
-
-            text += f"""<b>{i}.</b> {status_emoji} {status.upper()} <code>{order_id}</code>
-   {side_emoji} {side} {token_name} | {price_str}¢ | {amount} USDT
-   📊 Market ID: {market_id} | {market_title[:25]}...
-   ⚙️ Reposition threshold: {reposition_threshold_cents:.2f}¢
-   📅 {date_str}
-
-"""
+        text += "".join(
+            format_order_entry(i, order)
+            for i, order in enumerate(orders_page, start_idx + 1)
+        )
 
     return {
         "list_text": text,
@@ -384,45 +389,10 @@ Page {current_page + 1} of {(total + items_per_page - 1) // items_per_page if to
 
 """
 
-    for i, order in enumerate(orders_page, start_idx + 1):
-        order_id = order.get("order_id", "N/A")
-        market_id = order.get("market_id", "N/A")
-        market_title = order.get("market_title", "N/A")
-        token_name = order.get("token_name", "N/A")
-        side = order.get("side", "N/A")
-        target_price = order.get("target_price", 0)
-        amount = order.get("amount", 0)
-        status = order.get("status", "unknown")
-        # Нормализуем статус: приводим к нижнему регистру и убираем пробелы
-        status = str(status).lower().strip() if status else "unknown"
-        reposition_threshold_cents = float(order.get("reposition_threshold_cents"))
-
-        created_at = order.get("created_at")
-        # SQLite возвращает TIMESTAMP как строку в формате "YYYY-MM-DD HH:MM:SS"
-        # Берем первые 16 символов для формата "YYYY-MM-DD HH:MM"
-        date_str = (
-            created_at[:16] if created_at and len(str(created_at)) >= 16 else "N/A"
-        )
-
-        # Статус с эмодзи
-        status_emoji = {"pending": "⏳", "canceled": "🔴", "finished": "✅"}.get(
-            status, "❓"
-        )
-
-        # Направление с эмодзи
-        side_emoji = "📈" if side == "BUY" else "📉"
-
-        # Форматируем цену в центах
-        target_price_cents = target_price * 100
-        price_str = f"{target_price_cents:.2f}".rstrip("0").rstrip(".")
-
-        text += f"""<b>{i}.</b> {status_emoji} {status.upper()} <code>{order_id}</code>
-   {side_emoji} {side} {token_name} | {price_str}¢ | {amount} USDT
-   📊 Market ID: {market_id} | {market_title[:25]}...
-   ⚙️ Reposition threshold: {reposition_threshold_cents:.2f}¢
-   📅 {date_str}
-
-"""
+    text += "".join(
+        format_order_entry(i, order)
+        for i, order in enumerate(orders_page, start_idx + 1)
+    )
 
     return {
         "list_text": text,
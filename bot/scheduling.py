@@ -0,0 +1,32 @@
+"""Расписание периодических фоновых задач бота."""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def sleep_until_next_run(
+    loop: asyncio.AbstractEventLoop, deadline: float, interval: float, task_name: str
+) -> float:
+    """
+    Ждет наступления deadline и возвращает время следующего запуска.
+
+    Интервал отсчитывается от начала предыдущего запуска, а не от его
+    окончания, поэтому длительность работы не сдвигает расписание. Если
+    работа заняла больше интервала, пропущенные запуски не выполняются
+    подряд: ожидание продолжается до следующего слота расписания.
+    """
+    delay = deadline - loop.time()
+    if delay <= 0:
+        # Переходим на ближайший слот расписания строго в будущем
+        missed_runs = int(-delay // interval) + 1
+        logger.warning(
+            f"{task_name} overran its interval by {-delay:.1f}s, "
+            f"skipping {missed_runs} missed run(s)"
+        )
+        deadline += missed_runs * interval
+        delay = deadline - loop.time()
+
+    await asyncio.sleep(delay)
+    return deadline + interval
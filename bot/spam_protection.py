@@ -1,15 +1,39 @@
 """Middleware для защиты от спама."""
 
+import asyncio
 import logging
 import time
-from collections import defaultdict, deque
+from array import array
+from collections import OrderedDict
 from typing import Any, Callable, Dict
 
 from aiogram import BaseMiddleware, Bot
-from aiogram.types import TelegramObject
+from aiogram.types import TelegramObject, Update
 
 logger = logging.getLogger(__name__)
 
+# Максимальное количество отслеживаемых пользователей (давно неактивные вытесняются)
+MAX_TRACKED_USERS = 10000
+
+# Как часто (в событиях) удалять истекшие блокировки пользователей, которые не вернулись
+BLOCKED_SWEEP_EVERY = 10000
+
+SPAM_WARNING_TEXT = "🚫 Пожалуйста, не спамьте. Подождите 30 секунд."
+
+# Ссылки на фоновые задачи отправки предупреждений (чтобы их не собрал GC)
+_background_tasks: set[asyncio.Task] = set()
+
+
+class _EventWindow:
+    """Кольцевой буфер времени последних событий пользователя (limit + 1 записей)."""
+
+    __slots__ = ("timestamps", "head", "count")
+
+    def __init__(self, size: int):
+        self.timestamps = array("d", [0.0] * size)
+        self.head = 0
+        self.count = 0
+
 
 class AntiSpamMiddleware(BaseMiddleware):
     def __init__(self, bot: Bot, limit=5, interval=2, block_duration=30):
@@ -18,44 +42,107 @@ class AntiSpamMiddleware(BaseMiddleware):
         self.limit = limit
         self.interval = interval
         self.block_duration = block_duration
-        self.user_spam_tracker: Dict[int, deque] = defaultdict(deque)
+        self.window_size = limit + 1
+        self.user_spam_tracker: OrderedDict[int, _EventWindow] = OrderedDict()
         self.user_blocked_until: Dict[int, float] = {}
+        self.events_count = 0
+
+    def _get_window(self, uid: int) -> _EventWindow:
+        """Возвращает окно событий пользователя (LRU, не более MAX_TRACKED_USERS)."""
+        window = self.user_spam_tracker.get(uid)
+        if window is None:
+            window = _EventWindow(self.window_size)
+            self.user_spam_tracker[uid] = window
+            if len(self.user_spam_tracker) > MAX_TRACKED_USERS:
+                self.user_spam_tracker.popitem(last=False)
+        else:
+            self.user_spam_tracker.move_to_end(uid)
+        return window
+
+    def _evict_stale(self, now: float) -> None:
+        """
+        Удаляет окна пользователей, не активных дольше interval.
+
+        Такие окна уже не могут привести к блокировке, а трекер упорядочен
+        по последней активности, поэтому достаточно снимать записи с начала.
+        """
+        tracker = self.user_spam_tracker
+        while tracker:
+            window = next(iter(tracker.values()))
+            # timestamps[head - 1] - время последнего события пользователя
+            if now - window.timestamps[window.head - 1] <= self.interval:
+                break
+            tracker.popitem(last=False)
+
+        self.events_count += 1
+        if self.events_count >= BLOCKED_SWEEP_EVERY:
+            self.events_count = 0
+            self.user_blocked_until = {
+                uid: until
+                for uid, until in self.user_blocked_until.items()
+                if until > now
+            }
+
+    def _send_warning(self, uid: int) -> None:
+        """Отправляет предупреждение в фоне, не задерживая обработку апдейтов."""
+        task = asyncio.create_task(self._send_warning_message(uid))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def _send_warning_message(self, uid: int) -> None:
+        try:
+            await self.bot.send_message(uid, SPAM_WARNING_TEXT)
+        except Exception as e:
+            logger.warning(f"Не удалось отправить предупреждение о спаме {uid}: {e}")
 
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Any],
-        event: TelegramObject,
+        event: Update,
         data: Dict[str, Any],
     ) -> Any:
-        user = event.from_user
+        # Middleware регистрируется на уровне Update: проверяем только сообщения
+        # и callback-запросы (служебные апдейты aiogram-dialog пропускаем)
+        if event.message is None and event.callback_query is None:
+            return await handler(event, data)
+
+        # Пользователя определяет UserContextMiddleware aiogram
+        user = data.get("event_from_user")
         if not user:
             return await handler(event, data)
 
         uid = user.id
-        now = time.time()
+        now = time.monotonic()
 
-        if uid in self.user_blocked_until and now < self.user_blocked_until[uid]:
-            logger.warning(f"Пользователь {user.full_name} заблокирован за спам")
-            await self.bot.send_message(
-                uid, "🚫 Пожалуйста, не спамьте. Подождите 30 секунд."
-            )
-            return
+        blocked_until = self.user_blocked_until.get(uid)
+        if blocked_until is not None:
+            if now < blocked_until:
+                # Предупреждение уже отправлено при блокировке - событие просто отбрасываем
+                logger.debug(f"Пользователь {user.full_name} заблокирован за спам")
+                return
+            del self.user_blocked_until[uid]
 
-        timestamps = self.user_spam_tracker[uid]
-        timestamps.append(now)
+        self._evict_stale(now)
 
-        while timestamps and now - timestamps[0] > self.interval:
-            timestamps.popleft()
+        # Записываем событие в кольцевой буфер: после записи head указывает
+        # на самое старое из последних limit + 1 событий
+        window = self._get_window(uid)
+        window.timestamps[window.head] = now
+        window.head = (window.head + 1) % self.window_size
+        if window.count < self.window_size:
+            window.count += 1
 
-        if len(timestamps) > self.limit:
+        # Больше limit событий за interval секунд - блокируем
+        if (
+            window.count == self.window_size
+            and now - window.timestamps[window.head] <= self.interval
+        ):
             self.user_blocked_until[uid] = now + self.block_duration
-            self.user_spam_tracker[uid].clear()
+            window.count = 0
             logger.warning(
                 f"🔒 Пользователь {user.full_name} временно заблокирован за спам"
             )
-            await self.bot.send_message(
-                uid, "🚫 Пожалуйста, не спамьте. Подождите 30 секунд."
-            )
+            self._send_warning(uid)
             return
 
         return await handler(event, data)
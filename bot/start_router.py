@@ -3,12 +3,15 @@ Router for user registration flow (/start command).
 Handles the complete registration process from wallet address to API key.
 """
 
+import asyncio
 import hashlib
 import logging
 import re
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
+from aes import decrypt, encrypt
 from aiogram import Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
@@ -46,6 +49,37 @@ class RegistrationStates(StatesGroup):
     waiting_api_key = State()
 
 
+# ============================================================================
+# Registration photo
+# ============================================================================
+
+SPOT_ADDR_PHOTO_PATH = Path(__file__).parent.parent / "files" / "spot_addr.png"
+
+REGISTRATION_CAPTION = """🔐 Bot Registration
+    
+⚠️ Attention: All data (wallet address, private key, API key) is encrypted using a private encryption key and stored in an encrypted form.
+The data is never used in its raw form and is not shared with third parties.
+
+Please enter your Balance spot address found <a href="https://app.opinion.trade?code=BJea79">in your profile</a>:
+
+⚠️ Important: You must specify the spot address for which you received the API key."""
+
+# file_id фото после первой загрузки в Telegram: повторно отправляем по file_id,
+# чтобы не загружать файл на каждый /start
+_spot_addr_file_id: Optional[str] = None
+
+
+async def send_registration_photo(message: Message) -> None:
+    """Sends registration instruction photo (uploads the file only once)."""
+    global _spot_addr_file_id
+
+    photo = _spot_addr_file_id or FSInputFile(SPOT_ADDR_PHOTO_PATH)
+    sent = await message.answer_photo(photo, caption=REGISTRATION_CAPTION)
+
+    if _spot_addr_file_id is None and sent.photo:
+        _spot_addr_file_id = sent.photo[-1].file_id
+
+
 # ============================================================================
 # Router and handlers
 # ============================================================================
@@ -53,6 +87,24 @@ class RegistrationStates(StatesGroup):
 start_router = Router()
 
 
+def _encrypt_for_state(value: str) -> list[str]:
+    """
+    Шифрует значение для хранения в FSM состоянии.
+
+    Состояние может храниться в Redis, поэтому ключи пользователя не должны
+    попадать туда в открытом виде. Возвращает [ciphertext, nonce] в hex
+    (состояние сериализуется в JSON).
+    """
+    ciphertext, nonce = encrypt(value)
+    return [ciphertext.hex(), nonce.hex()]
+
+
+def _decrypt_from_state(value: list[str]) -> str:
+    """Расшифровывает значение, сохраненное через _encrypt_for_state."""
+    ciphertext, nonce = value
+    return decrypt(bytes.fromhex(ciphertext), bytes.fromhex(nonce))
+
+
 @start_router.message(Command("start"))
 async def cmd_start(message: Message, state: FSMContext):
     """Handler for /start command - start of registration process."""
@@ -82,19 +134,7 @@ Use the /support command to contact administrator."""
     # await state.set_state(RegistrationStates.waiting_invite)
 
     # Временно пропускаем инвайт и сразу переходим к запросу кошелька
-    photo_path = Path(__file__).parent.parent / "files" / "spot_addr.png"
-    photo = FSInputFile(str(photo_path))
-    await message.answer_photo(
-        photo,
-        caption="""🔐 Bot Registration
-    
-⚠️ Attention: All data (wallet address, private key, API key) is encrypted using a private encryption key and stored in an encrypted form.
-The data is never used in its raw form and is not shared with third parties.
-
-Please enter your Balance spot address found <a href="https://app.opinion.trade?code=BJea79">in your profile</a>:
-
-⚠️ Important: You must specify the spot address for which you received the API key.""",
-    )
+    await send_registration_photo(message)
     await state.set_state(RegistrationStates.waiting_wallet)
 
 
@@ -132,20 +172,7 @@ Please enter a valid invite code:"""
 
     # Переходим к следующему шагу
     # Send image with caption in one message
-    photo_path = Path(__file__).parent.parent / "files" / "spot_addr.png"
-
-    photo = FSInputFile(str(photo_path))
-    await message.answer_photo(
-        photo,
-        caption="""🔐 Bot Registration
-    
-⚠️ Attention: All data (wallet address, private key, API key) is encrypted using a private encryption key and stored in an encrypted form.
-The data is never used in its raw form and is not shared with third parties.
-
-Please enter your Balance spot address found <a href="https://app.opinion.trade?code=BJea79">in your profile</a>:
-
-⚠️ Important: You must specify the spot address for which you received the API key.""",
-    )
+    await send_registration_photo(message)
     await state.set_state(RegistrationStates.waiting_wallet)
 
 
@@ -167,7 +194,7 @@ Please enter a different wallet address:"""
         )
         return
 
-    await state.update_data(wallet_address=wallet_address)
+    await state.update_data(wallet_address=_encrypt_for_state(wallet_address))
 
     # Удаляем сообщение пользователя с адресом кошелька
     try:
@@ -199,7 +226,7 @@ Please enter a different private key:"""
         )
         return
 
-    await state.update_data(private_key=private_key)
+    await state.update_data(private_key=_encrypt_for_state(private_key))
 
     # Удаляем сообщение пользователя с приватным ключом
     try:
@@ -235,8 +262,8 @@ Please enter a different API key:"""
     telegram_id = message.from_user.id
 
     # Подготавливаем данные для проверки подключения
-    wallet_address = data["wallet_address"].strip()
-    private_key = data["private_key"].strip()
+    wallet_address = _decrypt_from_state(data["wallet_address"]).strip()
+    private_key = _decrypt_from_state(data["private_key"]).strip()
     api_key_clean = api_key.strip()
 
     # Проверяем подключение к API и получаем статистику перед сохранением в БД
@@ -260,10 +287,12 @@ Please enter a different API key:"""
         # Пытаемся создать клиент
         test_client = create_client(test_user_data)
 
-        # Получаем данные аккаунта
-        balance = await get_usdt_balance(test_client)
-        open_orders = await get_my_orders(test_client, status=ORDER_STATUS_PENDING)
-        positions = await get_my_positions(test_client, limit=100)
+        # Получаем данные аккаунта (независимые запросы выполняются параллельно)
+        balance, open_orders, positions = await asyncio.gather(
+            get_usdt_balance(test_client),
+            get_my_orders(test_client, status=ORDER_STATUS_PENDING),
+            get_my_positions(test_client, limit=100),
+        )
 
         # Подсчитываем количество открытых ордеров
         open_orders_count = len(open_orders) if open_orders else 0
@@ -6,10 +6,13 @@ PROCESS OVERVIEW:
 ================
 
 1. MAIN LOOP (async_sync_all_orders):
-   - Retrieves all users from the database
-   - For each user, processes their active orders sequentially
+   - Retrieves users with pending orders from the database (single query)
+   - Processes users concurrently, at most SYNC_CONCURRENCY at a time
+   - Each user's orders are processed sequentially (sync_user_orders)
    - Outputs final statistics (cancelled, placed, errors)
    - Each user is processed independently with their own API client
+   - Each user has their own timeout (USER_SYNC_TIMEOUT), so one stuck user
+     does not abort the whole cycle
 
 2. ORDER STATUS CHECK (process_user_orders):
    For each active order from database:
@@ -103,6 +106,8 @@ ARCHITECTURE:
 - async_sync_all_orders(): Main async function used by bot (background task)
   * Logs processing time for each user (start, end, duration)
   * Uses try/except/finally to ensure time logging always happens
+- sync_user_orders(): Cancels and re-places orders of one user, returns (cancelled, placed)
+- sync_user_orders_limited(): Wraps sync_user_orders with semaphore, timeout and error handling
 - main(): Synchronous function for standalone script execution (legacy, not used in bot)
 - process_user_orders(): Processes all orders for one user, returns lists and notifications
   * Checks order status via API before processing (get_order_by_id)
@@ -111,7 +116,7 @@ ARCHITECTURE:
 - cancel_orders_batch(): Synchronous batch cancellation wrapper
 - place_orders_batch(): Synchronous batch placement wrapper
 - send_price_change_notification(): Sends price change notification to user
-- send_order_updated_notification(): Sends success notification after DB update
+- send_order_updated_notification(): Sends success notification after batched DB update
 - send_order_placement_error_notification(): Sends error notification if placement fails
 - send_order_filled_notification(): Sends notification when order is filled
   * Uses API order object (not database dict) for accurate data
@@ -120,23 +125,24 @@ ARCHITECTURE:
 
 import asyncio
 import time
-import traceback
+from operator import attrgetter
 from typing import Dict, List, Optional, Tuple
 
 from client_factory import create_client, setup_proxy
 from config import TICK_SIZE
 from database import (
-    get_all_users,
     get_user,
     get_user_orders,
-    update_order_in_db,
+    get_users_with_pending_orders,
     update_order_status,
+    update_orders_in_db,
 )
 from logger_config import setup_logger
 from opinion_api_wrapper import (
     ORDER_STATUS_CANCELED,
     ORDER_STATUS_FINISHED,
     get_order_by_id,
+    invalidate_balance_cache,
 )
 from opinion_clob_sdk.chain.py_order_utils.model.order import PlaceOrderDataInput
 from opinion_clob_sdk.chain.py_order_utils.model.order_type import LIMIT_ORDER
@@ -148,6 +154,28 @@ logger = setup_logger("sync_orders", "sync_orders.log")
 # Настраиваем прокси
 setup_proxy()
 
+# Максимальное количество пользователей, синхронизируемых одновременно
+SYNC_CONCURRENCY = 20
+
+# Таймаут синхронизации одного пользователя (секунды)
+USER_SYNC_TIMEOUT = 120
+
+# Максимальное количество уведомлений пользователям в секунду (лимит Telegram - 30/с)
+NOTIFICATIONS_PER_SECOND = 25
+
+# Ссылка на страницу маркета (к ней добавляется topicId)
+MARKET_DETAIL_URL = "https://app.opinion.trade/detail?topicId="
+
+_get_price = attrgetter("price")
+
+# Ссылки на задачи перестановки ордеров (чтобы их не собрал GC, если
+# синхронизация пользователя прервана таймаутом во время перестановки)
+_reposition_tasks: set[asyncio.Task] = set()
+
+# Общий для всех пользователей интервал между уведомлениями синхронизации
+_notification_lock = asyncio.Lock()
+_next_notification_at = 0.0
+
 
 def get_current_market_price(client, token_id: str, side: str) -> Optional[float]:
     """
@@ -184,16 +212,20 @@ def get_current_market_price(client, token_id: str, side: str) -> Optional[float
         # Для BUY и SELL используем best_bid (самый высокий бид)
         # BUY: когда цена ВНИЗ (best_bid уменьшается), ордер ближе к исполнению
         # SELL: когда цена ВВЕРХ (best_bid увеличивается), ордер ближе к исполнению
-        if bids and len(bids) > 0:
-            # Сортируем биды по убыванию цены
+        if bids:
+            # Быстрый путь: все уровни корректные, цены извлекаются через map в C
+            try:
+                return max(map(float, map(_get_price, bids)))  # Самый высокий бид
+            except (AttributeError, ValueError, TypeError):
+                pass
+
+            # Медленный путь: пропускаем некорректные уровни
             bid_prices = []
             for bid in bids:
-                if hasattr(bid, "price"):
-                    try:
-                        price = float(bid.price)
-                        bid_prices.append(price)
-                    except (ValueError, TypeError):
-                        continue
+                try:
+                    bid_prices.append(float(bid.price))
+                except (AttributeError, ValueError, TypeError):
+                    continue
             if bid_prices:
                 return max(bid_prices)  # Самый высокий бид
 
@@ -370,8 +402,11 @@ async def process_user_orders(
 
                 # Продолжаем обработку, если не удалось проверить статус (graceful degradation)
 
-            # Получаем текущую цену рынка
-            new_current_price = get_current_market_price(client, token_id, side)
+            # Получаем текущую цену рынка (синхронный HTTP-запрос SDK выполняется
+            # в потоке, чтобы не блокировать event loop и таймаут пользователя)
+            new_current_price = await asyncio.to_thread(
+                get_current_market_price, client, token_id, side
+            )
             if not new_current_price:
                 logger.warning(
                     f"Не удалось получить текущую цену для ордера {order_id}"
@@ -617,11 +652,27 @@ def place_orders_batch(client, orders_params: List[Dict]) -> List:
         return results
 
     except Exception as e:
-        logger.error(f"Ошибка при batch размещении ордеров: {e}")
-        traceback.print_exc()
+        logger.error(f"Ошибка при batch размещении ордеров: {e}", exc_info=True)
         return []
 
 
+async def _throttle_notifications() -> None:
+    """
+    Ждет, пока можно отправить следующее уведомление.
+
+    Пользователи синхронизируются параллельно, поэтому без общего интервала
+    уведомления разных пользователей уходят пачкой и превышают лимит Telegram.
+    """
+    global _next_notification_at
+
+    async with _notification_lock:
+        now = asyncio.get_running_loop().time()
+        if _next_notification_at > now:
+            await asyncio.sleep(_next_notification_at - now)
+            now = _next_notification_at
+        _next_notification_at = now + 1 / NOTIFICATIONS_PER_SECOND
+
+
 async def send_price_change_notification(bot, telegram_id: int, notification: Dict):
     """Отправляет уведомление пользователю о смещении цены."""
     try:
@@ -670,6 +721,7 @@ async def send_price_change_notification(bot, telegram_id: int, notification: Di
 
 {status_emoji} <b>Status:</b> {status_text}"""
 
+        await _throttle_notifications()
         await bot.send_message(chat_id=telegram_id, text=message)
         logger.info(
             f"Sent price change notification to user {telegram_id} for order {notification['order_id']}"
@@ -705,6 +757,7 @@ async def send_order_updated_notification(
 
 Order has been successfully moved to maintain the offset."""
 
+        await _throttle_notifications()
         await bot.send_message(chat_id=telegram_id, text=message)
         logger.info(
             f"Sent order updated notification to user {telegram_id} for order {new_order_id}"
@@ -754,6 +807,7 @@ async def send_order_placement_error_notification(
 
 <b>⚠️ IMPORTANT:</b> Your old order has been cancelled. Please check your balance and place a new order manually if needed."""
 
+        await _throttle_notifications()
         await bot.send_message(chat_id=telegram_id, text=message)
         logger.info(
             f"Sent order placement error notification to user {telegram_id} for order {old_order_id}"
@@ -809,19 +863,18 @@ async def send_order_filled_notification(bot, telegram_id: int, api_order):
         side_emoji = "📈" if side_enum == "Buy" else "📉"
 
         # Формируем ссылку на корневой маркет
+        # (если нет root_market_id, используем обычный market_id)
         if root_market_id:
-            market_url = f"https://app.opinion.trade/detail?topicId={root_market_id}"
             market_link_text = (
                 root_market_title[:50]
                 if root_market_title
                 else f"Market {root_market_id}"
             )
         else:
-            # Если нет root_market_id, используем обычный market_id
-            market_url = f"https://app.opinion.trade/detail?topicId={market_id}"
             market_link_text = (
                 market_title[:50] if market_title else f"Market {market_id}"
             )
+        market_url = f"{MARKET_DETAIL_URL}{root_market_id or market_id}"
 
         message = f"""🚨 <b>Order Filled - Action Required</b>
 
@@ -837,13 +890,16 @@ async def send_order_filled_notification(bot, telegram_id: int, api_order):
 
 Your order has been successfully filled! Please check the market and consider placing new orders. 🎉"""
 
+        await _throttle_notifications()
         await bot.send_message(chat_id=telegram_id, text=message, parse_mode="HTML")
         logger.info(
             f"Отправлено уведомление об исполнении ордера {order_id} пользователю {telegram_id}"
         )
     except Exception as e:
-        logger.error(f"Ошибка при отправке уведомления пользователю {telegram_id}: {e}")
-        logger.error(traceback.format_exc())
+        logger.error(
+            f"Ошибка при отправке уведомления пользователю {telegram_id}: {e}",
+            exc_info=True,
+        )
 
 
 async def send_cancellation_error_notification(
@@ -893,6 +949,7 @@ The following orders could not be cancelled:
 • Please check the orders manually and cancel them if needed
 • The repositioning will be retried in the next sync cycle"""
 
+        await _throttle_notifications()
         await bot.send_message(chat_id=telegram_id, text=message)
         logger.info(
             f"Sent cancellation error notification to user {telegram_id} for {len(failed_orders)} failed orders"
@@ -903,156 +960,242 @@ The following orders could not be cancelled:
         )
 
 
-async def async_sync_all_orders(bot):
+async def place_user_orders(
+    bot, telegram_id: int, client, orders_to_place: list
+) -> int:
     """
-    Асинхронная функция синхронизации ордеров с уведомлениями пользователям.
+    Размещает новые ордера пользователя батчем, обновляет их в БД
+    и отправляет уведомления.
+
+    Returns:
+        Количество успешно размещенных ордеров
+    """
+    logger.info(f"📝 Размещение ордеров для пользователя {telegram_id}...")
+    # Обертываем синхронный вызов в asyncio.to_thread, чтобы не блокировать event loop
+    place_results = await asyncio.to_thread(place_orders_batch, client, orders_to_place)
+    invalidate_balance_cache(client)
+    # Подсчитываем успешно размещенные ордера для общей статистики
+    # Согласно документации: result['success'] = True и result['result'].errno == 0 означает успех
+    # (детальное логирование уже происходит в place_orders_batch)
+    placed_count = sum(
+        1
+        for r in place_results
+        if isinstance(r, dict)
+        and r.get("success", False)
+        and r.get("result")
+        and r.get("result").errno == 0
+    )
+
+    # Обновляем цены в БД для успешно размещенных ордеров и отправляем уведомления
+    # Также обрабатываем ошибки размещения
+    # ВАЖНО: Уведомления об ошибках отправляются для КАЖДОГО ордера отдельно,
+    # если его размещение не удалось (не для всего батча целиком)
+    # Индекс i в place_results соответствует индексу i в orders_to_place (гарантировано API)
+    # (order_params, old_order_id, new_order_id) успешно перемещенных ордеров
+    placed_updates = []
+    for i, result in enumerate(place_results):
+        # Берем параметры ордера по индексу; old_order_id - order_id старого
+        # ордера, который был отменен
+        order_params = orders_to_place[i]
+        old_order_id = order_params.get("old_order_id")
+
+        # Проверяем успешность размещения согласно документации
+        # result['success'] = True и result['result'].errno == 0 означает успех
+        result_data = result.get("result")
+        is_success = (
+            result.get("success", False) and result_data and result_data.errno == 0
+        )
+
+        if not is_success:
+            # Обрабатываем ошибку размещения для конкретного ордера
+            # Мы знаем какой ордер не разместился: это orders_to_place[i] с old_order_id
+            try:
+                if result_data and result_data.errno != 0:
+                    errmsg = result_data.errmsg
+                    errno = result_data.errno
+
+                    # Отправляем уведомление пользователю об ошибке для ЭТОГО ордера
+                    # В уведомлении будет old_order_id (который был отменен) и информация о новом ордере
+                    await send_order_placement_error_notification(
+                        bot,
+                        telegram_id,
+                        order_params,
+                        old_order_id,
+                        errno,
+                        errmsg,
+                    )
+                    logger.warning(
+                        f"Ошибка размещения ордера {old_order_id} (индекс {i} в батче): errno={errno}, errmsg={errmsg}"
+                    )
+                else:
+                    # Если нет result_data или success=False
+                    error = result.get("error", "Unknown error")
+                    logger.error(
+                        f"Не удалось разместить ордер {old_order_id} (индекс {i} в батче): {error}"
+                    )
+            except Exception as e:
+                logger.error(
+                    f"Ошибка при обработке ошибки размещения ордера {old_order_id}: {e}"
+                )
+            continue
+
+        # Структура из логов: result['result'].result.order_data.order_id
+        try:
+            result_data = result.get("result")
+            if result_data and result_data.errno == 0:
+                new_order_id = result_data.result.order_data.order_id
+
+                if new_order_id and old_order_id:
+                    placed_updates.append((order_params, old_order_id, new_order_id))
+        except (AttributeError, TypeError) as e:
+            logger.error(
+                f"Не удалось извлечь order_id из результата размещения {i}: {e}"
+            )
+
+    # Обновляем все перемещенные ордера в БД одной транзакцией
+    await update_orders_in_db(
+        [
+            (
+                old_order_id,
+                new_order_id,
+                order_params["current_price_at_creation"],
+                order_params["target_price"],
+            )
+            for order_params, old_order_id, new_order_id in placed_updates
+        ]
+    )
+    # Отправляем уведомления об успешном обновлении
+    for order_params, _, new_order_id in placed_updates:
+        await send_order_updated_notification(
+            bot, telegram_id, order_params, new_order_id
+        )
+
+    return placed_count
+
+
+async def sync_user_orders(bot, telegram_id: int) -> Tuple[int, int]:
+    """
+    Синхронизирует ордера одного пользователя: отменяет и переставляет ордера,
+    цена которых сместилась достаточно сильно, и отправляет уведомления.
 
     Args:
         bot: Экземпляр aiogram Bot для отправки уведомлений
+        telegram_id: ID пользователя в Telegram
+
+    Returns:
+        Кортеж (количество отмененных ордеров, количество размещенных ордеров)
     """
-    logger.info("")
-    logger.info("╔" + "=" * 78 + "╗")
-    logger.info("║" + " " * 30 + "НАЧАЛО СИНХРОНИЗАЦИИ ОРДЕРОВ" + " " * 30 + "║")
-    logger.info("╚" + "=" * 78 + "╝")
-    logger.info("")
+    # Получаем списки ордеров для отмены и размещения, а также уведомления
+    (
+        orders_to_cancel,
+        orders_to_place,
+        price_change_notifications,
+    ) = await process_user_orders(telegram_id, bot)
 
-    # Получаем всех пользователей
-    users = await get_all_users()
-    logger.info(f"Найдено пользователей: {len(users)}")
+    # Отправляем уведомления о смещении цены (независимо от успешности отмены/создания)
+    for notification in price_change_notifications:
+        await send_price_change_notification(bot, telegram_id, notification)
 
-    if not users:
-        logger.warning("В базе данных нет пользователей")
-        return
+    if not orders_to_cancel and not orders_to_place:
+        logger.info(f"Нет ордеров для перемещения у пользователя {telegram_id}")
+        return 0, 0
 
-    # Общая статистика
-    total_cancelled = 0
-    total_placed = 0
-    total_errors = 0
+    logger.info(
+        f"Ордеров для отмены у пользователя {telegram_id}: {len(orders_to_cancel)}"
+    )
+    logger.info(
+        f"Ордеров для размещения у пользователя {telegram_id}: {len(orders_to_place)}"
+    )
 
-    # Обрабатываем ордера для каждого пользователя
-    for telegram_id in users:
-        # Засекаем время начала обработки пользователя
-        user_start_time = time.time()
-        user_start_time_str = time.strftime(
-            "%Y-%m-%d %H:%M:%S", time.localtime(user_start_time)
+    # Проверяем, что списки согласованы (должны быть одинаковой длины, если есть ордера для перестановки)
+    # Если will_reposition = True, ордер добавляется в ОБА списка одновременно в одном блоке кода,
+    # поэтому теоретически несоответствие невозможно. Но эта проверка - защита от багов в логике
+    # (например, если в будущем код изменится и ордер будет добавлен только в один список).
+    if len(orders_to_cancel) != len(orders_to_place):
+        logger.error(
+            f"КРИТИЧЕСКАЯ ОШИБКА: Несоответствие списков! Отмена={len(orders_to_cancel)}, размещение={len(orders_to_place)}"
+        )
+        logger.error(
+            "Это указывает на ошибку в логике process_user_orders. Пропускаем обработку для безопасности."
         )
+        return 0, 0
 
-        logger.info(f"\n{'=' * 80}")
-        logger.info(f"Обработка пользователя {telegram_id}")
-        logger.info(f"⏰ Время начала: {user_start_time_str}")
-        logger.info(f"{'=' * 80}")
+    # Если списки пустые, но есть уведомления - это нормально (изменение недостаточно)
+    if not orders_to_cancel:
+        logger.info(
+            f"Нет ордеров для перестановки у пользователя {telegram_id} (изменение недостаточно для всех ордеров)"
+        )
+        return 0, 0
 
-        try:
-            # Получаем списки ордеров для отмены и размещения, а также уведомления
-            (
-                orders_to_cancel,
-                orders_to_place,
-                price_change_notifications,
-            ) = await process_user_orders(telegram_id, bot)
+    # Получаем клиент для пользователя
+    user = await get_user(telegram_id)
+    # create_client остается синхронным, но это быстрая операция
+    client = create_client(user)
+
+    # Отмена, размещение и запись в БД выполняются в отдельной задаче под
+    # asyncio.shield: таймаут USER_SYNC_TIMEOUT не должен прервать эту
+    # последовательность на середине (старые ордера на бирже уже отменены,
+    # а новые не размещены или не записаны в БД)
+    task = asyncio.create_task(
+        reposition_user_orders(
+            bot, telegram_id, client, orders_to_cancel, orders_to_place
+        )
+    )
+    _reposition_tasks.add(task)
+    task.add_done_callback(_reposition_tasks.discard)
+    return await asyncio.shield(task)
 
-            # Отправляем уведомления о смещении цены (независимо от успешности отмены/создания)
-            for notification in price_change_notifications:
-                await send_price_change_notification(bot, telegram_id, notification)
 
-            if not orders_to_cancel and not orders_to_place:
-                logger.info(f"Нет ордеров для перемещения у пользователя {telegram_id}")
-                continue
+async def reposition_user_orders(
+    bot, telegram_id: int, client, orders_to_cancel: list, orders_to_place: list
+) -> Tuple[int, int]:
+    """
+    Отменяет старые ордера пользователя и размещает вместо них новые.
 
-            logger.info(f"Ордеров для отмены: {len(orders_to_cancel)}")
-            logger.info(f"Ордеров для размещения: {len(orders_to_place)}")
+    Новые ордера размещаются только если все старые успешно отменены.
 
-            # Проверяем, что списки согласованы (должны быть одинаковой длины, если есть ордера для перестановки)
-            # Если will_reposition = True, ордер добавляется в ОБА списка одновременно в одном блоке кода,
-            # поэтому теоретически несоответствие невозможно. Но эта проверка - защита от багов в логике
-            # (например, если в будущем код изменится и ордер будет добавлен только в один список).
-            if len(orders_to_cancel) != len(orders_to_place):
-                logger.error(
-                    f"КРИТИЧЕСКАЯ ОШИБКА: Несоответствие списков! Отмена={len(orders_to_cancel)}, размещение={len(orders_to_place)}"
-                )
-                logger.error(
-                    "Это указывает на ошибку в логике process_user_orders. Пропускаем обработку для безопасности."
-                )
-                continue
+    Returns:
+        Кортеж (количество отмененных ордеров, количество размещенных ордеров)
+    """
+    # Отменяем старые ордера
+    cancelled_count = 0
+    placed_count = 0
+    if orders_to_cancel:
+        logger.info(f"🔄 Отмена ордеров для пользователя {telegram_id}...")
+        # Обертываем синхронный вызов в asyncio.to_thread, чтобы не блокировать event loop
+        cancel_results = await asyncio.to_thread(
+            cancel_orders_batch, client, orders_to_cancel
+        )
+        invalidate_balance_cache(client)
 
-            # Если списки пустые, но есть уведомления - это нормально (изменение недостаточно)
-            if not orders_to_cancel:
-                logger.info(
-                    f"Нет ордеров для перестановки у пользователя {telegram_id} (изменение недостаточно для всех ордеров)"
-                )
-                continue
+        # Проверяем успешность отмены более тщательно
+        # Списки orders_to_cancel и orders_to_place всегда одинаковой длины (проверено выше),
+        # поэтому можем безопасно использовать индекс i для обоих списков
+        failed_cancellations = []  # Список неудачных отмен для уведомления
 
-            # Получаем клиент для пользователя
-            user = await get_user(telegram_id)
-            # create_client остается синхронным, но это быстрая операция
-            client = create_client(user)
-
-            # Отменяем старые ордера
-            cancelled_count = 0
-            if orders_to_cancel:
-                logger.info(f"🔄 Отмена ордеров для пользователя {telegram_id}...")
-                # Обертываем синхронный вызов в asyncio.to_thread, чтобы не блокировать event loop
-                cancel_results = await asyncio.to_thread(
-                    cancel_orders_batch, client, orders_to_cancel
-                )
+        for i, result in enumerate(cancel_results):
+            order_id = orders_to_cancel[i]
+            # Получаем market_id из соответствующего ордера в orders_to_place
+            # Индекс i безопасен, так как списки одинаковой длины
+            market_id_info = f" (User: {telegram_id}, Market: {orders_to_place[i].get('market_id', 'N/A')})"
+            is_success = False
 
-                # Проверяем успешность отмены более тщательно
-                # Списки orders_to_cancel и orders_to_place всегда одинаковой длины (проверено выше),
-                # поэтому можем безопасно использовать индекс i для обоих списков
-                failed_cancellations = []  # Список неудачных отмен для уведомления
-
-                for i, result in enumerate(cancel_results):
-                    order_id = orders_to_cancel[i]
-                    # Получаем market_id из соответствующего ордера в orders_to_place
-                    # Индекс i безопасен, так как списки одинаковой длины
-                    market_id_info = f" (User: {telegram_id}, Market: {orders_to_place[i].get('market_id', 'N/A')})"
-                    is_success = False
-
-                    if result.get("success", False):
-                        # Дополнительная проверка через result_data.errno
-                        result_data = result.get("result")
-                        if result_data and hasattr(result_data, "errno"):
-                            if result_data.errno == 0:
-                                is_success = True
-                                logger.info(
-                                    f"✅ Отменен ордер: {order_id}{market_id_info}"
-                                )
-                            else:
-                                # Собираем информацию об ошибке для уведомления
-                                errno = result_data.errno
-                                errmsg = getattr(result_data, "errmsg", "N/A")
-                                logger.error(
-                                    f"❌ Ошибка при отмене ордера {order_id}{market_id_info}: errno={errno}, errmsg={errmsg}"
-                                )
-
-                                # Сохраняем информацию о неудачной отмене
-                                order_params = orders_to_place[i]
-                                failed_cancellations.append(
-                                    {
-                                        "order_id": order_id,
-                                        "market_id": order_params.get(
-                                            "market_id", "N/A"
-                                        ),
-                                        "token_name": order_params.get(
-                                            "token_name", "N/A"
-                                        ),
-                                        "side": "BUY"
-                                        if order_params.get("side") == OrderSide.BUY
-                                        else "SELL",
-                                        "errno": errno,
-                                        "errmsg": errmsg,
-                                    }
-                                )
-                        else:
-                            # Если нет result_data, считаем успешным если success=True
-                            is_success = True
-                            logger.info(f"✅ Отменен ордер: {order_id}{market_id_info}")
+            if result.get("success", False):
+                # Дополнительная проверка через result_data.errno
+                result_data = result.get("result")
+                if result_data and hasattr(result_data, "errno"):
+                    if result_data.errno == 0:
+                        is_success = True
+                        logger.info(f"✅ Отменен ордер: {order_id}{market_id_info}")
                     else:
-                        # Если success=False, собираем информацию об ошибке
-                        error = result.get("error", "Unknown error")
+                        # Собираем информацию об ошибке для уведомления
+                        errno = result_data.errno
+                        errmsg = getattr(result_data, "errmsg", "N/A")
                         logger.error(
-                            f"❌ Не удалось отменить ордер {order_id}{market_id_info}: {error}"
+                            f"❌ Ошибка при отмене ордера {order_id}{market_id_info}: errno={errno}, errmsg={errmsg}"
                         )
 
+                        # Сохраняем информацию о неудачной отмене
                         order_params = orders_to_place[i]
                         failed_cancellations.append(
                             {
@@ -1062,135 +1205,102 @@ async def async_sync_all_orders(bot):
                                 "side": "BUY"
                                 if order_params.get("side") == OrderSide.BUY
                                 else "SELL",
-                                "errno": "N/A",
-                                "errmsg": str(error),
+                                "errno": errno,
+                                "errmsg": errmsg,
                             }
                         )
+                else:
+                    # Если нет result_data, считаем успешным если success=True
+                    is_success = True
+                    logger.info(f"✅ Отменен ордер: {order_id}{market_id_info}")
+            else:
+                # Если success=False, собираем информацию об ошибке
+                error = result.get("error", "Unknown error")
+                logger.error(
+                    f"❌ Не удалось отменить ордер {order_id}{market_id_info}: {error}"
+                )
 
-                    if is_success:
-                        cancelled_count += 1
+                order_params = orders_to_place[i]
+                failed_cancellations.append(
+                    {
+                        "order_id": order_id,
+                        "market_id": order_params.get("market_id", "N/A"),
+                        "token_name": order_params.get("token_name", "N/A"),
+                        "side": "BUY"
+                        if order_params.get("side") == OrderSide.BUY
+                        else "SELL",
+                        "errno": "N/A",
+                        "errmsg": str(error),
+                    }
+                )
 
-                total_cancelled += cancelled_count
+            if is_success:
+                cancelled_count += 1
 
-                # Проверяем, что все ордера успешно отменены
-                if cancelled_count != len(orders_to_cancel):
-                    failed_count = len(orders_to_cancel) - cancelled_count
-                    logger.error(
-                        f"Не удалось отменить {failed_count} из {len(orders_to_cancel)} ордеров"
-                    )
-                    logger.warning(
-                        "Пропускаем размещение новых ордеров, так как не все старые были отменены"
-                    )
+        # Проверяем, что все ордера успешно отменены
+        if cancelled_count != len(orders_to_cancel):
+            failed_count = len(orders_to_cancel) - cancelled_count
+            logger.error(
+                f"Не удалось отменить {failed_count} из {len(orders_to_cancel)} ордеров"
+            )
+            logger.warning(
+                "Пропускаем размещение новых ордеров, так как не все старые были отменены"
+            )
 
-                    # Отправляем уведомление пользователю об ошибке отмены
-                    await send_cancellation_error_notification(
-                        bot, telegram_id, failed_cancellations
-                    )
-                    continue
+            # Отправляем уведомление пользователю об ошибке отмены
+            await send_cancellation_error_notification(
+                bot, telegram_id, failed_cancellations
+            )
+            return cancelled_count, 0
+
+    # Размещаем новые ордера только если все старые успешно отменены
+    # БАТЧИ ФОРМИРУЮТСЯ ПО ПОЛЬЗОВАТЕЛЮ: каждый пользователь обрабатывается отдельно,
+    # и для каждого пользователя создается свой батч ордеров (все ордера одного пользователя в одном батче)
+    if orders_to_place and cancelled_count == len(orders_to_cancel):
+        placed_count = await place_user_orders(
+            bot, telegram_id, client, orders_to_place
+        )
 
-            # Размещаем новые ордера только если все старые успешно отменены
-            # БАТЧИ ФОРМИРУЮТСЯ ПО ПОЛЬЗОВАТЕЛЮ: каждый пользователь обрабатывается отдельно,
-            # и для каждого пользователя создается свой батч ордеров (все ордера одного пользователя в одном батче)
-            if orders_to_place and cancelled_count == len(orders_to_cancel):
-                logger.info(f"📝 Размещение ордеров для пользователя {telegram_id}...")
-                # Обертываем синхронный вызов в asyncio.to_thread, чтобы не блокировать event loop
-                place_results = await asyncio.to_thread(
-                    place_orders_batch, client, orders_to_place
-                )
-                # Подсчитываем успешно размещенные ордера для общей статистики
-                # Согласно документации: result['success'] = True и result['result'].errno == 0 означает успех
-                # (детальное логирование уже происходит в place_orders_batch)
-                placed_count = sum(
-                    1
-                    for r in place_results
-                    if isinstance(r, dict)
-                    and r.get("success", False)
-                    and r.get("result")
-                    and r.get("result").errno == 0
-                )
-                total_placed += placed_count
-
-                # Обновляем цены в БД для успешно размещенных ордеров и отправляем уведомления
-                # Также обрабатываем ошибки размещения
-                # ВАЖНО: Уведомления об ошибках отправляются для КАЖДОГО ордера отдельно,
-                # если его размещение не удалось (не для всего батча целиком)
-                # Индекс i в place_results соответствует индексу i в orders_to_place (гарантировано API)
-                for i, result in enumerate(place_results):
-                    order_params = orders_to_place[
-                        i
-                    ]  # Берем параметры ордера по индексу
-                    old_order_id = order_params.get(
-                        "old_order_id"
-                    )  # Это order_id старого ордера, который был отменен
-
-                    # Проверяем успешность размещения согласно документации
-                    # result['success'] = True и result['result'].errno == 0 означает успех
-                    result_data = result.get("result")
-                    is_success = (
-                        result.get("success", False)
-                        and result_data
-                        and result_data.errno == 0
-                    )
+    return cancelled_count, placed_count
 
-                    if not is_success:
-                        # Обрабатываем ошибку размещения для конкретного ордера
-                        # Мы знаем какой ордер не разместился: это orders_to_place[i] с old_order_id
-                        try:
-                            if result_data and result_data.errno != 0:
-                                errmsg = result_data.errmsg
-                                errno = result_data.errno
-
-                                # Отправляем уведомление пользователю об ошибке для ЭТОГО ордера
-                                # В уведомлении будет old_order_id (который был отменен) и информация о новом ордере
-                                await send_order_placement_error_notification(
-                                    bot,
-                                    telegram_id,
-                                    order_params,
-                                    old_order_id,
-                                    errno,
-                                    errmsg,
-                                )
-                                logger.warning(
-                                    f"Ошибка размещения ордера {old_order_id} (индекс {i} в батче): errno={errno}, errmsg={errmsg}"
-                                )
-                            else:
-                                # Если нет result_data или success=False
-                                error = result.get("error", "Unknown error")
-                                logger.error(
-                                    f"Не удалось разместить ордер {old_order_id} (индекс {i} в батче): {error}"
-                                )
-                        except Exception as e:
-                            logger.error(
-                                f"Ошибка при обработке ошибки размещения ордера {old_order_id}: {e}"
-                            )
-                        continue
 
-                    # Структура из логов: result['result'].result.order_data.order_id
-                    try:
-                        result_data = result.get("result")
-                        if result_data and result_data.errno == 0:
-                            new_order_id = result_data.result.order_data.order_id
-
-                            if new_order_id and old_order_id:
-                                # Обновляем ордер в БД
-                                await update_order_in_db(
-                                    old_order_id,
-                                    new_order_id,
-                                    order_params["current_price_at_creation"],
-                                    order_params["target_price"],
-                                )
-                                # Отправляем уведомление об успешном обновлении
-                                await send_order_updated_notification(
-                                    bot, telegram_id, order_params, new_order_id
-                                )
-                    except (AttributeError, TypeError) as e:
-                        logger.error(
-                            f"Не удалось извлечь order_id из результата размещения {i}: {e}"
-                        )
+async def sync_user_orders_limited(
+    bot, telegram_id: int, semaphore: asyncio.Semaphore
+) -> Tuple[int, int, bool]:
+    """
+    Синхронизирует ордера пользователя с ограничением параллелизма и таймаутом.
+
+    Ошибка или зависание одного пользователя не прерывает синхронизацию остальных.
+
+    Returns:
+        Кортеж (отменено, размещено, была ли ошибка)
+    """
+    async with semaphore:
+        # Засекаем время начала обработки пользователя
+        user_start_time = time.time()
+        user_start_time_str = time.strftime(
+            "%Y-%m-%d %H:%M:%S", time.localtime(user_start_time)
+        )
+
+        logger.info(f"\n{'=' * 80}")
+        logger.info(f"Обработка пользователя {telegram_id}")
+        logger.info(f"⏰ Время начала: {user_start_time_str}")
+        logger.info(f"{'=' * 80}")
 
+        try:
+            cancelled, placed = await asyncio.wait_for(
+                sync_user_orders(bot, telegram_id), timeout=USER_SYNC_TIMEOUT
+            )
+            return cancelled, placed, False
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Превышен таймаут синхронизации пользователя {telegram_id} "
+                f"({USER_SYNC_TIMEOUT}s)"
+            )
+            return 0, 0, True
         except Exception as e:
             logger.error(f"Ошибка при обработке пользователя {telegram_id}: {e}")
-            total_errors += 1
+            return 0, 0, True
         finally:
             # Засекаем время окончания обработки пользователя (всегда выполняется)
             user_end_time = time.time()
@@ -1207,6 +1317,42 @@ async def async_sync_all_orders(bot):
             )
             logger.info(f"{'=' * 80}")
 
+
+async def async_sync_all_orders(bot):
+    """
+    Асинхронная функция синхронизации ордеров с уведомлениями пользователям.
+
+    Args:
+        bot: Экземпляр aiogram Bot для отправки уведомлений
+    """
+    logger.info("")
+    logger.info("╔" + "=" * 78 + "╗")
+    logger.info("║" + " " * 30 + "НАЧАЛО СИНХРОНИЗАЦИИ ОРДЕРОВ" + " " * 30 + "║")
+    logger.info("╚" + "=" * 78 + "╝")
+    logger.info("")
+
+    # Получаем только пользователей с активными ордерами
+    users = await get_users_with_pending_orders()
+    logger.info(f"Найдено пользователей с активными ордерами: {len(users)}")
+
+    if not users:
+        logger.info("Нет пользователей с активными ордерами")
+        return
+
+    # Обрабатываем пользователей параллельно, не более SYNC_CONCURRENCY одновременно
+    semaphore = asyncio.Semaphore(SYNC_CONCURRENCY)
+    results = await asyncio.gather(
+        *(
+            sync_user_orders_limited(bot, telegram_id, semaphore)
+            for telegram_id in users
+        )
+    )
+
+    # Общая статистика
+    total_cancelled = sum(cancelled for cancelled, _, _ in results)
+    total_placed = sum(placed for _, placed, _ in results)
+    total_errors = sum(1 for _, _, failed in results if failed)
+
     # Итоговая статистика
     logger.info("")
     logger.info("╔" + "=" * 78 + "╗")
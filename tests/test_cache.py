@@ -0,0 +1,94 @@
+"""
+Тесты для модуля cache.py
+"""
+
+import asyncio
+from unittest.mock import patch
+
+from cache import InflightRequests, TTLCache
+
+
+class TestTTLCache:
+    """Тесты для TTLCache"""
+
+    def test_get_returns_stored_value(self):
+        """Тест: сохраненное значение возвращается до истечения TTL"""
+        cache = TTLCache(ttl=10)
+        cache.set("key", {"value": 1})
+
+        assert cache.get("key") == {"value": 1}
+        assert cache.get("missing") is None
+        assert cache.get("missing", "default") == "default"
+
+    def test_expired_value_is_removed(self):
+        """Тест: устаревшая запись не возвращается и удаляется из кэша"""
+        cache = TTLCache(ttl=10)
+
+        with patch("cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+
+        with patch("cache.time.monotonic", return_value=109.0):
+            assert cache.get("key") == "value"
+
+        with patch("cache.time.monotonic", return_value=110.0):
+            assert cache.get("key") is None
+
+        assert len(cache) == 0
+
+    def test_maxsize_evicts_least_recently_used(self):
+        """Тест: при переполнении удаляется давно не использованная запись"""
+        cache = TTLCache(ttl=10, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "a" становится последней использованной
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_pop_removes_value(self):
+        """Тест: pop удаляет запись, отсутствующий ключ не вызывает ошибку"""
+        cache = TTLCache(ttl=10)
+        cache.set("key", "value")
+
+        cache.pop("key")
+        cache.pop("key")
+
+        assert cache.get("key") is None
+
+
+class TestInflightRequests:
+    """Тесты для InflightRequests"""
+
+    async def test_concurrent_calls_share_one_request(self):
+        """Тест: одновременные вызовы с одним ключом выполняют один запрос"""
+        inflight = InflightRequests()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(
+            *(inflight.run("key", fetch) for _ in range(5))
+        )
+
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert len(inflight) == 0
+
+    async def test_result_is_not_cached(self):
+        """Тест: после завершения запроса следующий вызов выполняет новый запрос"""
+        inflight = InflightRequests()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await inflight.run("key", fetch) == 1
+        assert await inflight.run("key", fetch) == 2
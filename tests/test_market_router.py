@@ -0,0 +1,159 @@
+"""
+Тесты для вспомогательных функций модуля market_router.py
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from cache import market_cache
+
+from market_router import (
+    Orderbook,
+    calculate_spread_and_liquidity,
+    calculate_target_price,
+    count_whole_ticks,
+    format_price_levels,
+    get_market_info,
+    get_orderbook_top,
+    invalidate_market,
+    place_order,
+)
+from opinion_clob_sdk.chain.py_order_utils.model.sides import OrderSide
+
+
+def level(price: str, size: str = "1"):
+    """Создает уровень стакана в формате SDK (цена и размер - строки)."""
+    return SimpleNamespace(price=price, size=size)
+
+
+class TestCountWholeTicks:
+    """Тесты для функции count_whole_ticks"""
+
+    def test_no_tick_lost_to_float_error(self):
+        """Тест: погрешность float не уменьшает количество тиков"""
+        # (0.011 - 0.001) / 0.001 == 9.999999999999998 в float
+        assert count_whole_ticks(0.011 - 0.001, 0.001) == 10
+
+        for price_millis in range(1, 1000):
+            price = price_millis / 1000
+            assert count_whole_ticks(price - 0.001, 0.001) == price_millis - 1
+            assert count_whole_ticks(0.999 - price, 0.001) == 999 - price_millis
+
+    def test_partial_tick_is_dropped(self):
+        """Тест: неполный тик не учитывается, отрицательная дистанция дает 0"""
+        assert count_whole_ticks(0.4755 - 0.001, 0.001) == 474
+        assert count_whole_ticks(-0.0005, 0.001) == 0
+
+
+class TestCalculateTargetPrice:
+    """Тесты для функции calculate_target_price"""
+
+    def test_offset_and_limits(self):
+        """Тест: смещение по направлению и ограничение диапазоном 0.001 - 0.999"""
+        assert calculate_target_price(0.5, "BUY", 10, 0.001) == (0.49, True)
+        assert calculate_target_price(0.5, "SELL", 10, 0.001) == (0.51, True)
+        assert calculate_target_price(0.002, "BUY", 5, 0.001) == (0.001, True)
+        assert calculate_target_price(0.998, "SELL", 5, 0.001) == (0.999, True)
+
+
+class TestOrderbookHelpers:
+    """Тесты для расчета спреда, ликвидности и лучших уровней стакана"""
+
+    def test_spread_and_liquidity(self):
+        """Тест: лучшие цены и ликвидность топ-5 уровней"""
+        orderbook = Orderbook(
+            bids=[level("0.40", "10"), level("0.45", "5")],
+            asks=[level("0.50", "3"), level("0.55", "2")],
+        )
+
+        info = calculate_spread_and_liquidity(orderbook, "YES")
+
+        assert info["best_bid"] == 0.45
+        assert info["best_ask"] == 0.50
+        assert info["bid_liquidity"] == 15
+        assert info["ask_liquidity"] == 5
+        assert info["total_liquidity"] == 20
+
+    def test_empty_orderbook(self):
+        """Тест: пустой стакан и отсутствующий стакан"""
+        empty = calculate_spread_and_liquidity(Orderbook(bids=[], asks=[]), "NO")
+        missing = calculate_spread_and_liquidity(None, "NO")
+
+        for info in (empty, missing):
+            assert info["best_bid"] is None
+            assert info["best_ask"] is None
+            assert info["total_liquidity"] == 0
+
+    def test_orderbook_top_skips_malformed_levels(self):
+        """Тест: лучшие уровни и крайние цены, некорректные уровни пропускаются"""
+        orderbook = Orderbook(
+            bids=[level(f"0.{p}") for p in (30, 41, 35, 44, 38, 42)]
+            + [level("bad"), object()],
+            asks=[level("0.60"), level("0.50"), level(None)],
+        )
+
+        top = get_orderbook_top(orderbook)
+
+        assert top["bids"] == [0.44, 0.42, 0.41, 0.38, 0.35]
+        assert top["asks"] == [0.50, 0.60]
+        assert top["min_bid"] == 0.30
+        assert top["max_ask"] == 0.60
+
+    def test_format_price_levels(self):
+        """Тест: уровни нумеруются, дальний уровень добавляется только если не показан"""
+        text = format_price_levels("Best 5 bids:", [45.0, 44.0], 30.0)
+        assert text == "Best 5 bids:\n1. 45.0 ¢\n2. 44.0 ¢\n...\n30.0 ¢\n"
+
+        text = format_price_levels("Best 5 asks:", [50.0, 60.0], 60.0)
+        assert text == "Best 5 asks:\n1. 50.0 ¢\n2. 60.0 ¢\n"
+
+
+class TestGetMarketInfo:
+    """Тесты для функции get_market_info"""
+
+    async def test_concurrent_calls_share_request_and_invalidate(self):
+        """Тест: одновременные запросы объединяются, invalidate_market сбрасывает кэш"""
+        market_cache.clear()
+        client = MagicMock()
+        client.get_market.return_value = SimpleNamespace(
+            errno=0, result=SimpleNamespace(data="market")
+        )
+
+        markets = await asyncio.gather(*(get_market_info(client, 42) for _ in range(3)))
+        assert markets == ["market"] * 3
+        assert client.get_market.call_count == 1
+
+        await get_market_info(client, 42)
+        assert client.get_market.call_count == 1
+
+        invalidate_market(42)
+        await get_market_info(client, 42)
+        assert client.get_market.call_count == 2
+        market_cache.clear()
+
+
+class TestPlaceOrder:
+    """Тесты для функции place_order"""
+
+    async def test_failed_order_invalidates_market_cache(self):
+        """Тест: ошибка размещения сбрасывает закэшированные данные рынка"""
+        market_cache.clear()
+        market_cache.set((42, False), "market")
+        client = MagicMock()
+        client.place_order.return_value = SimpleNamespace(
+            errno=10200, errmsg="Market is not active"
+        )
+        order_params = {
+            "telegram_id": 1,
+            "market_id": 42,
+            "token_id": "token",
+            "side": OrderSide.BUY,
+            "price": "0.5",
+            "amount": 10,
+        }
+
+        success, order_id, error = await place_order(client, order_params)
+
+        assert (success, order_id, error) == (False, None, "Market is not active")
+        assert market_cache.get((42, False)) is None
@@ -0,0 +1,91 @@
+"""
+Тесты для модуля opinion_api_wrapper.py
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from cache import balance_cache
+from opinion_api_wrapper import get_balances_map, invalidate_balance_cache
+
+
+def make_client(*balances) -> MagicMock:
+    """Мок клиента Opinion SDK, возвращающего переданные балансы"""
+    client = MagicMock()
+    client.api_key = "api_key"
+    client.get_my_balances.return_value = SimpleNamespace(
+        errno=0, result=SimpleNamespace(balances=list(balances))
+    )
+    return client
+
+
+def make_balance(token, amount) -> SimpleNamespace:
+    """Запись баланса в формате ответа API"""
+    return SimpleNamespace(quote_token=token, available_balance=amount)
+
+
+class TestGetBalancesMap:
+    """Тесты для get_balances_map и invalidate_balance_cache"""
+
+    @pytest.fixture(autouse=True)
+    def clear_balance_cache(self):
+        """Очищает кэш балансов до и после каждого теста"""
+        balance_cache.clear()
+        yield
+        balance_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_within_ttl(self):
+        """Тест: повторный запрос в пределах TTL не обращается к API"""
+        client = make_client(make_balance("0xABC", "10.5"))
+
+        with patch("cache.time.monotonic", return_value=100.0):
+            assert await get_balances_map(client) == {"0xabc": 10.5}
+            assert await get_balances_map(client) == {"0xabc": 10.5}
+
+        assert client.get_my_balances.call_count == 1
+
+        # После истечения TTL баланс запрашивается заново
+        with patch("cache.time.monotonic", return_value=200.0):
+            await get_balances_map(client)
+
+        assert client.get_my_balances.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_new_request(self):
+        """Тест: после сброса кэша баланс запрашивается из API заново"""
+        client = make_client(make_balance("0xabc", "1"))
+
+        await get_balances_map(client)
+        invalidate_balance_cache(client)
+        await get_balances_map(client)
+
+        assert client.get_my_balances.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_malformed_entry_is_skipped(self):
+        """Тест: некорректная запись пропускается, остальные балансы сохраняются"""
+        client = make_client(
+            make_balance("0xabc", "5"),
+            make_balance(None, "1"),
+            make_balance("0xdef", "not a number"),
+            make_balance("0x123", "2.5"),
+        )
+
+        assert await get_balances_map(client) == {"0xabc": 5.0, "0x123": 2.5}
+
+    @pytest.mark.asyncio
+    async def test_caller_mutation_does_not_corrupt_cache(self):
+        """Тест: изменение результата вызывающим не портит кэш"""
+        client = make_client(make_balance("0xabc", "3"))
+
+        first = await get_balances_map(client)
+        first["0xabc"] = 0.0
+        first["0xdef"] = 1.0
+
+        second = await get_balances_map(client)
+        second.clear()
+
+        assert await get_balances_map(client) == {"0xabc": 3.0}
+        assert client.get_my_balances.call_count == 1
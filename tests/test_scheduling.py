@@ -0,0 +1,65 @@
+"""
+Тесты для модуля scheduling.py
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from scheduling import sleep_until_next_run
+
+
+def make_loop(now: float) -> MagicMock:
+    """Мок event loop с фиксированным текущим временем"""
+    loop = MagicMock()
+    loop.time.return_value = now
+    return loop
+
+
+class TestSleepUntilNextRun:
+    """Тесты для sleep_until_next_run"""
+
+    @pytest.mark.asyncio
+    async def test_sleeps_until_deadline(self):
+        """Тест: запуск уложился в интервал - ждем до deadline"""
+        with patch("scheduling.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            next_run = await sleep_until_next_run(make_loop(10.5), 12.0, 2.0, "Test")
+
+        mock_sleep.assert_awaited_once_with(1.5)
+        assert next_run == 14.0
+
+    @pytest.mark.asyncio
+    async def test_overrun_waits_for_next_slot(self):
+        """Тест: при превышении интервала пропущенный запуск не выполняется сразу"""
+        with patch("scheduling.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            next_run = await sleep_until_next_run(make_loop(13.0), 12.0, 2.0, "Test")
+
+        mock_sleep.assert_awaited_once_with(1.0)
+        assert next_run == 16.0
+
+    @pytest.mark.asyncio
+    async def test_overrun_by_several_intervals(self):
+        """Тест: при превышении на несколько интервалов ждем ближайший будущий слот"""
+        with patch("scheduling.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            next_run = await sleep_until_next_run(make_loop(16.0), 12.0, 2.0, "Test")
+
+        mock_sleep.assert_awaited_once_with(2.0)
+        assert next_run == 20.0
+
+    @pytest.mark.asyncio
+    async def test_schedule_keeps_grid_after_overrun(self):
+        """Тест: после долгого запуска следующий стартует в слот сетки, а не сразу"""
+        loop = asyncio.get_running_loop()
+        interval = 0.2
+        starts = []
+
+        start = loop.time()
+        next_run = start + interval
+        for duration in (0.3, 0.0):
+            starts.append(loop.time() - start)
+            await asyncio.sleep(duration)
+            next_run = await sleep_until_next_run(loop, next_run, interval, "Test")
+        starts.append(loop.time() - start)
+
+        assert starts[1] == pytest.approx(0.4, abs=0.05)
+        assert starts[2] == pytest.approx(0.6, abs=0.05)
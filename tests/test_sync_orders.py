@@ -8,8 +8,11 @@
 - Проверка правильности списков для отмены/размещения
 - Уведомления об ошибках отмены ордеров (send_cancellation_error_notification)
 - Уведомления об ошибках размещения ордеров (send_order_placement_error_notification)
+- Параллельная синхронизация пользователей (async_sync_all_orders)
 """
 
+import asyncio
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -18,10 +21,12 @@ from config import TICK_SIZE
 # Импортируем функции для тестирования
 # conftest.py настроит sys.path для работы с относительными импортами
 from sync_orders import (
+    async_sync_all_orders,
     calculate_new_target_price,
     process_user_orders,
     send_cancellation_error_notification,
     send_order_placement_error_notification,
+    sync_user_orders_limited,
 )
 
 # Мокируем OrderSide для тестов
@@ -772,5 +777,178 @@ class TestOrderPlacementErrorNotification:
             assert mock_bot.send_message.called
 
 
+class TestAsyncSyncAllOrders:
+    """Тесты для функции async_sync_all_orders"""
+
+    @pytest.mark.asyncio
+    async def test_failed_user_does_not_stop_others(self):
+        """Тест: ошибка или таймаут одного пользователя не прерывает остальных"""
+        processed = []
+
+        async def fake_sync_user_orders(bot, telegram_id):
+            if telegram_id == 1:
+                raise Exception("API error")
+            if telegram_id == 2:
+                await asyncio.sleep(1)
+            processed.append(telegram_id)
+            return 1, 1
+
+        with (
+            patch(
+                "sync_orders.get_users_with_pending_orders", new_callable=AsyncMock
+            ) as mock_get_users,
+            patch("sync_orders.sync_user_orders", fake_sync_user_orders),
+            patch("sync_orders.USER_SYNC_TIMEOUT", 0.05),
+        ):
+            mock_get_users.return_value = [1, 2, 3, 4]
+            await async_sync_all_orders(AsyncMock())
+
+        assert sorted(processed) == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_timeout_does_not_interrupt_placement(self):
+        """Тест: таймаут во время размещения не прерывает запись новых ордеров в БД"""
+        recorded = []
+
+        async def fake_place_user_orders(bot, telegram_id, client, orders_to_place):
+            await asyncio.sleep(0.1)
+            recorded.extend(orders_to_place)
+            return len(orders_to_place)
+
+        order = {"old_order_id": "old-1", "market_id": 1}
+        with (
+            patch(
+                "sync_orders.process_user_orders", new_callable=AsyncMock
+            ) as mock_process,
+            patch("sync_orders.get_user", new_callable=AsyncMock),
+            patch("sync_orders.create_client"),
+            patch(
+                "sync_orders.cancel_orders_batch",
+                return_value=[{"success": True, "result": None}],
+            ),
+            patch("sync_orders.invalidate_balance_cache"),
+            patch("sync_orders.place_user_orders", fake_place_user_orders),
+            patch("sync_orders.USER_SYNC_TIMEOUT", 0.05),
+        ):
+            mock_process.return_value = (["old-1"], [order], [])
+            cancelled, placed, failed = await sync_user_orders_limited(
+                AsyncMock(), 1, asyncio.Semaphore(1)
+            )
+            assert failed is True
+            assert recorded == []
+
+            await asyncio.sleep(0.2)
+
+        assert recorded == [order]
+
+    @pytest.mark.asyncio
+    async def test_timeout_after_cancel_still_places_orders(self):
+        """Тест: таймаут сразу после отмены не оставляет пользователя без ордеров"""
+        recorded = []
+
+        def slow_cancel_orders_batch(client, order_ids):
+            time.sleep(0.1)
+            return [{"success": True, "result": None} for _ in order_ids]
+
+        async def fake_place_user_orders(bot, telegram_id, client, orders_to_place):
+            recorded.extend(orders_to_place)
+            return len(orders_to_place)
+
+        order = {"old_order_id": "old-1", "market_id": 1}
+        with (
+            patch(
+                "sync_orders.process_user_orders", new_callable=AsyncMock
+            ) as mock_process,
+            patch("sync_orders.get_user", new_callable=AsyncMock),
+            patch("sync_orders.create_client"),
+            patch("sync_orders.cancel_orders_batch", slow_cancel_orders_batch),
+            patch("sync_orders.invalidate_balance_cache"),
+            patch("sync_orders.place_user_orders", fake_place_user_orders),
+            patch("sync_orders.USER_SYNC_TIMEOUT", 0.05),
+        ):
+            mock_process.return_value = (["old-1"], [order], [])
+            _, _, failed = await sync_user_orders_limited(
+                AsyncMock(), 1, asyncio.Semaphore(1)
+            )
+            assert failed is True
+
+            await asyncio.sleep(0.2)
+
+        assert recorded == [order]
+
+    @pytest.mark.asyncio
+    async def test_slow_price_fetch_does_not_block_others(self):
+        """Тест: медленное получение цены одного пользователя не блокирует остальных"""
+
+        async def fake_get_user_orders(telegram_id, status=None):
+            return [
+                {
+                    "order_id": f"order_{telegram_id}",
+                    "market_id": 100,
+                    "token_id": "slow" if telegram_id == 1 else "fast",
+                    "token_name": "YES",
+                    "side": "BUY",
+                    "current_price": 0.500,
+                    "target_price": 0.490,
+                    "offset_ticks": 10,
+                    "amount": 100.0,
+                    "reposition_threshold_cents": 0.5,
+                    "status": "pending",
+                }
+            ]
+
+        def fake_get_current_market_price(client, token_id, side):
+            if token_id == "slow":
+                time.sleep(0.5)
+            return 0.500
+
+        with (
+            patch("sync_orders.get_user", new_callable=AsyncMock),
+            patch("sync_orders.get_user_orders", fake_get_user_orders),
+            patch("sync_orders.create_client"),
+            patch("sync_orders.get_order_by_id", new_callable=AsyncMock),
+            patch(
+                "sync_orders.get_current_market_price", fake_get_current_market_price
+            ),
+            patch("sync_orders.USER_SYNC_TIMEOUT", 0.2),
+        ):
+            semaphore = asyncio.Semaphore(2)
+            start = time.monotonic()
+            results = await asyncio.gather(
+                sync_user_orders_limited(AsyncMock(), 1, semaphore),
+                sync_user_orders_limited(AsyncMock(), 2, semaphore),
+            )
+            elapsed = time.monotonic() - start
+
+        assert results == [(0, 0, True), (0, 0, False)]
+        assert elapsed < 0.45
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_limited(self):
+        """Тест: одновременно обрабатывается не более SYNC_CONCURRENCY пользователей"""
+        active = 0
+        max_active = 0
+
+        async def fake_sync_user_orders(bot, telegram_id):
+            nonlocal active, max_active
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return 0, 0
+
+        with (
+            patch(
+                "sync_orders.get_users_with_pending_orders", new_callable=AsyncMock
+            ) as mock_get_users,
+            patch("sync_orders.sync_user_orders", fake_sync_user_orders),
+            patch("sync_orders.SYNC_CONCURRENCY", 3),
+        ):
+            mock_get_users.return_value = list(range(10))
+            await async_sync_all_orders(AsyncMock())
+
+        assert max_active == 3
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])